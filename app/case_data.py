@@ -128,7 +128,8 @@ CASE_DATABASE = {
                 discovered=False,
                 relevance_score=0.8,
                 category="opportunity",
-                points_value=15
+                points_value=15,
+                keywords=["unlocked", "kitchen door", "access"]
             ),
             Clue(
                 id="C2",
@@ -136,7 +137,8 @@ CASE_DATABASE = {
                 discovered=False,
                 relevance_score=0.9,
                 category="timeline",
-                points_value=25
+                points_value=25,
+                keywords=["thompson", "hurrying", "8:55", "bag"]
             ),
             Clue(
                 id="C3",
@@ -144,7 +146,8 @@ CASE_DATABASE = {
                 discovered=False,
                 relevance_score=0.9,
                 category="alibi",
-                points_value=20
+                points_value=20,
+                keywords=["glove", "size 9", "size 11", "hand size"]
             ),
             Clue(
                 id="C4",
@@ -152,7 +155,8 @@ CASE_DATABASE = {
                 discovered=False,
                 relevance_score=0.7,
                 category="opportunity",
-                points_value=15
+                points_value=15,
+                keywords=["security guard", "away", "10 minutes", "post"]
             )
         ],
         legal_rules=[
@@ -180,6 +184,10 @@ CASE_DATABASE = {
         ],
         background="A high-profile theft at a glamorous event with multiple suspects and circumstantial evidence. The case hinges on timing, opportunity, and reasonable doubt.",
         difficulty="medium",
+        keywords=[
+            "carlos rivera", "necklace", "theft", "gala", "kitchen",
+            "security footage", "glove", "thompson", "unlocked door"
+        ],
         objective=CaseObjective(
             title="Defend Carlos Rivera",
             description="You are the defense attorney for Carlos Rivera. Your task is to create reasonable doubt about his guilt and prove that someone else could have committed the theft.",
@@ -0,0 +1,67 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+_embeddings = None
+_load_lock = threading.Lock()
+_stats: Dict[str, Any] = {
+    "model_name": EMBEDDING_MODEL_NAME,
+    "loaded": False,
+    "load_seconds": None,
+    "memory_bytes": None
+}
+
+
+def _resident_memory_bytes() -> Optional[int]:
+    """Current resident set size of this process, if the platform exposes it"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # Peak rather than current RSS, reported in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+def get_embeddings():
+    """Return the process-wide sentence embedding model, loading it on first use"""
+    global _embeddings
+    if _embeddings is not None:
+        return _embeddings
+
+    with _load_lock:
+        if _embeddings is None:
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+
+            memory_before = _resident_memory_bytes()
+            started = time.perf_counter()
+            embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+            load_seconds = time.perf_counter() - started
+            memory_after = _resident_memory_bytes()
+
+            _stats["loaded"] = True
+            _stats["load_seconds"] = round(load_seconds, 3)
+            if memory_before is not None and memory_after is not None:
+                _stats["memory_bytes"] = max(memory_after - memory_before, 0)
+            logger.info(
+                "Loaded embedding model %s in %.2fs (%s bytes resident)",
+                EMBEDDING_MODEL_NAME, load_seconds, _stats["memory_bytes"]
+            )
+            _embeddings = embeddings
+    return _embeddings
+
+
+def get_embedding_stats() -> Dict[str, Any]:
+    """Model name, whether it is loaded, and how long and how much memory loading took"""
+    return dict(_stats)
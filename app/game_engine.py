@@ -1,44 +1,197 @@
 import os
 import json
-from typing import List, Dict, Any, Optional
+import asyncio
+from collections import deque
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple, Set
 from datetime import datetime
 import random
+import time
 from dotenv import load_dotenv
 load_dotenv()
 
-from langchain_groq import ChatGroq
-from langchain.prompts import PromptTemplate
-from langchain.schema import HumanMessage, SystemMessage
-from langchain.vectorstores import FAISS
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-
 from models import (
     GameState, GamePhase, CaseData, Witness, Evidence, Clue, 
     LegalRule, AIResponse, Verdict, ActionType, CaseObjective
 )
 from vector_store import VectorStoreManager
+from response_cache import SemanticResponseCache
+from pregenerated import PregeneratedResponses
+from llm_provider import Completion, LLMProvider, LangChainProvider, create_provider
 from case_data import CASE_DATABASE
+from metrics import LLM_CALLS, LLM_CALL_DURATION, LLM_TOKENS
+from tracing import span
+
+# Metric label for each kind of pre-generated output
+PREGENERATED_PROMPT_TYPES = {"intro": "intro", "evidence": "judge_evidence"}
+
+# Prompt templates, filled in with str.format
+WITNESS_INTRODUCTION_PROMPT = """
+            You are a court clerk introducing a witness to the stand.
+            
+            Witness: {witness_name}
+            Role: {witness_role}
+            Personality: {witness_personality}
+            
+            Provide a brief, professional introduction of the witness to the court.
+            """
+
+WITNESS_PROMPT = """
+            You are {witness_name}, a witness in a criminal trial.
+            
+            Your role: {witness_role}
+            Your personality: {witness_personality}
+            Your testimony: {witness_testimony}
+            
+            Question from the attorney: {question}
+            
+            Legal context: {legal_context}
+            Case context: {case_context}
+            
+            Respond as this witness would, considering their personality and role. Be realistic and consistent with their testimony. If the question reveals important information that could help the case, indicate this subtly.
+            """
+
+JUDGE_EVIDENCE_PROMPT = """
+            You are a judge presiding over a criminal trial. The defense attorney has presented evidence.
+            
+            Evidence: {evidence_name}
+            Description: {evidence_description}
+            Relevance: {evidence_relevance}
+            
+            Provide a brief response acknowledging the evidence and its admissibility. Be judicial and neutral.
+            """
+
+VERDICT_PROMPT = """
+            You are a judge delivering a verdict in a criminal trial.
+            
+            Case summary: {case_summary}
+            Evidence presented: {evidence_weight}
+            Witness credibility: {witness_credibility}
+            Clues discovered: {clues_discovered}
+            Player performance score: {player_score}
+            Defense won: {won_case}
+            
+            Based on the evidence and the defense attorney's performance, deliver a reasoned verdict (guilty or not guilty)
+            with detailed reasoning. Consider the burden of proof and reasonable doubt.
+            """
+
+JUDGE_CHAT_PROMPT = """
+            You are a judge in a criminal trial. A defense attorney is making a legal statement to you.
+            
+            Attorney's statement: {statement}
+            Case context: {case_context}
+            
+            Provide a brief, judicial response. Be authoritative but helpful. If the statement shows good legal understanding, acknowledge it. If it's incorrect, gently correct it.
+            """
 
 class CourtroomGameEngine:
-    def __init__(self):
-        self.groq_client = ChatGroq(
-            groq_api_key=os.getenv("GROQ_API_KEY"),
-            model_name="meta-llama/llama-4-scout-17b-16e-instruct"
+    def __init__(self, groq_client=None,
+                 vector_store_manager: Optional[VectorStoreManager] = None,
+                 llm_semaphore: Optional[asyncio.Semaphore] = None,
+                 response_cache: Optional[SemanticResponseCache] = None,
+                 pregenerated: Optional[PregeneratedResponses] = None,
+                 llm_provider: Optional[LLMProvider] = None):
+        # groq_client takes any LangChain chat model, e.g. ChatGroq or a test fake
+        if llm_provider is None:
+            llm_provider = LangChainProvider(groq_client) if groq_client is not None else create_provider()
+        self.llm_provider = llm_provider
+        # Bounds outstanding async LLM calls across every engine sharing it
+        self.llm_semaphore = llm_semaphore or asyncio.Semaphore(
+            int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
         )
+        self.response_cache = response_cache or SemanticResponseCache()
+        self.pregenerated = pregenerated or PregeneratedResponses()
         
-        self.vector_store_manager = VectorStoreManager()
         self.current_case: Optional[CaseData] = None
         self.game_state: Optional[GameState] = None
         self.conversation_history: List[Dict[str, Any]] = []
-        
-        
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
-        
-       
+        # This session's progress on top of the shared, immutable case template
+        self.presented_evidence: Set[str] = set()
+        self.discovered_clues: Set[str] = set()
+        # Recent game state snapshots as (version, state dict), for delta responses
+        self.state_version = 0
+        self._state_history = deque(maxlen=int(os.getenv("STATE_HISTORY_SIZE", "16")))
+        # Version and payload last saved to the session store
+        self.session_version = 0
+        self.session_payload: Optional[bytes] = None
+        
+        if vector_store_manager is not None:
+            # Shared with another engine, already initialized
+            self.vector_store_manager = vector_store_manager
+            return
+        
+        # Uses the process-wide embedding model shared by all vector stores
+        self.vector_store_manager = VectorStoreManager()
         self._initialize_vector_stores()
+        # Answers pre-generated by warm_response_cache.py
+        self.response_cache.load()
+        self.pregenerated.load()
+    
+    def new_session(self) -> "CourtroomGameEngine":
+        """Create an engine for another player that shares this engine's LLM client and vector stores"""
+        return CourtroomGameEngine(
+            llm_provider=self.llm_provider,
+            vector_store_manager=self.vector_store_manager,
+            llm_semaphore=self.llm_semaphore,
+            response_cache=self.response_cache,
+            pregenerated=self.pregenerated
+        )
+    
+    def _invoke_llm(self, prompt: str, prompt_type: str) -> str:
+        """Run a prompt through the LLM, blocking until the completion arrives"""
+        started = time.perf_counter()
+        try:
+            with span("llm"):
+                completion = self.llm_provider.complete(prompt, prompt_type)
+        except Exception:
+            self._record_llm_call(prompt_type, started, "error")
+            raise
+        self._record_llm_call(prompt_type, started, "success", completion)
+        return completion.content
+    
+    async def _ainvoke_llm(self, prompt: str, prompt_type: str) -> str:
+        """Run a prompt through the LLM without blocking the event loop"""
+        async with self.llm_semaphore:
+            started = time.perf_counter()
+            try:
+                with span("llm"):
+                    completion = await self.llm_provider.acomplete(prompt, prompt_type)
+            except Exception:
+                self._record_llm_call(prompt_type, started, "error")
+                raise
+        self._record_llm_call(prompt_type, started, "success", completion)
+        return completion.content
+    
+    async def _astream_llm(self, prompt: str, prompt_type: str) -> AsyncIterator[str]:
+        """Run a prompt through the LLM, yielding tokens as they arrive"""
+        async with self.llm_semaphore:
+            started = time.perf_counter()
+            last = None
+            try:
+                with span("llm"):
+                    async for chunk in self.llm_provider.astream(prompt, prompt_type):
+                        last = chunk
+                        if chunk.content:
+                            yield chunk.content
+            except Exception:
+                self._record_llm_call(prompt_type, started, "error")
+                raise
+        # Token usage, when reported, arrives with the last chunk
+        self._record_llm_call(prompt_type, started, "success", last)
+    
+    def _pregenerate_llm(self, prompt: str, kind: str) -> str:
+        """Generator for PregeneratedResponses, labelling each call with its prompt type"""
+        return self._invoke_llm(prompt, PREGENERATED_PROMPT_TYPES.get(kind, kind))
+    
+    @staticmethod
+    def _record_llm_call(prompt_type: str, started: float, outcome: str,
+                         completion: Optional[Completion] = None):
+        LLM_CALLS.inc(prompt_type=prompt_type, outcome=outcome)
+        LLM_CALL_DURATION.observe(time.perf_counter() - started, prompt_type=prompt_type)
+        if completion is not None:
+            if completion.prompt_tokens:
+                LLM_TOKENS.inc(completion.prompt_tokens, prompt_type=prompt_type, kind="prompt")
+            if completion.completion_tokens:
+                LLM_TOKENS.inc(completion.completion_tokens, prompt_type=prompt_type, kind="completion")
     
     def _initialize_vector_stores(self):
         """Initialize vector stores with legal knowledge and case data"""
@@ -66,6 +219,8 @@ class CourtroomGameEngine:
             case_id = random.choice(list(CASE_DATABASE.keys()))
         
         self.current_case = CASE_DATABASE[case_id]
+        self.presented_evidence = set()
+        self.discovered_clues = set()
         
         # Initialize game state
         self.game_state = GameState(
@@ -88,6 +243,16 @@ class CourtroomGameEngine:
         
         self._add_case_to_vector_store()
         
+        # Compile the case's keyword matcher and lookup indexes now rather than on the first action
+        self.current_case.keyword_matcher
+        self.current_case.witnesses_by_name
+        self.current_case.evidence_by_id
+        self.current_case.clues_by_id
+        
+        # Witness introductions and evidence rulings only depend on case data
+        if not self.pregenerated.is_scheduled(case_id):
+            self.pregenerated.schedule_case(case_id, self._pregeneration_prompts(self.current_case), self._pregenerate_llm)
+        
         return {
             "case_data": self.current_case,
             "objective": self.current_case.objective,
@@ -95,6 +260,15 @@ class CourtroomGameEngine:
             "available_actions": self.game_state.available_actions
         }
     
+    def _pregeneration_prompts(self, case: CaseData) -> Dict[Tuple[str, str], str]:
+        """Prompts whose output depends only on a case's static data"""
+        prompts = {}
+        for witness in case.witnesses:
+            prompts[("intro", witness.name.lower())] = self._format_witness_introduction_prompt(witness)
+        for evidence in case.evidence:
+            prompts[("evidence", evidence.id)] = self._format_judge_evidence_prompt(evidence)
+        return prompts
+    
     def _add_case_to_vector_store(self):
         """Add case-specific clues and evidence to vector store"""
         case_texts = []
@@ -124,8 +298,26 @@ class CourtroomGameEngine:
         if self.game_state.current_step >= self.game_state.max_steps:
             return {"error": "Maximum steps reached. Game over."}
         
+        witness = self._seat_witness(witness_name)
+        
+        # Generate witness introduction
+        introduction = self._generate_witness_introduction(witness)
+        
+        return self._record_witness_called(witness, introduction)
+    
+    async def acall_witness(self, witness_name: str) -> Dict[str, Any]:
+        """Async variant of call_witness"""
+        if self.game_state.current_step >= self.game_state.max_steps:
+            return {"error": "Maximum steps reached. Game over."}
+        
+        witness = self._seat_witness(witness_name)
+        introduction = await self._agenerate_witness_introduction(witness)
+        return self._record_witness_called(witness, introduction)
+    
+    def _seat_witness(self, witness_name: str) -> Witness:
+        """Find a witness and put them on the stand"""
         # Find the witness
-        witness = next((w for w in self.current_case.witnesses if w.name.lower() == witness_name.lower()), None)
+        witness = self.current_case.get_witness(witness_name)
         if not witness:
             raise ValueError(f"Witness {witness_name} not found")
         
@@ -134,10 +326,10 @@ class CourtroomGameEngine:
         self.game_state.phase = GamePhase.WITNESS_EXAMINATION
         self.game_state.current_step += 1
         self.game_state.available_actions = ["question_witness", "use_evidence", "get_clue"]
-        
-        # Generate witness introduction
-        introduction = self._generate_witness_introduction(witness)
-        
+        return witness
+    
+    def _record_witness_called(self, witness: Witness, introduction: str) -> Dict[str, Any]:
+        """Award points for calling a witness"""
         # Award points and update score
         points_earned = 5
         self.game_state.player_score += points_earned
@@ -151,40 +343,33 @@ class CourtroomGameEngine:
     
     def _generate_witness_introduction(self, witness: Witness) -> str:
         """Generate a witness introduction"""
-        prompt = PromptTemplate(
-            input_variables=["witness_name", "witness_role", "witness_personality"],
-            template="""
-            You are a court clerk introducing a witness to the stand.
-            
-            Witness: {witness_name}
-            Role: {witness_role}
-            Personality: {witness_personality}
-            
-            Provide a brief, professional introduction of the witness to the court.
-            """
-        )
-        
-        formatted_prompt = prompt.format(
+        introduction = self.pregenerated.get(self.current_case.case_id, "intro", witness.name.lower())
+        if introduction is not None:
+            return introduction
+        return self._invoke_llm(self._format_witness_introduction_prompt(witness), "intro")
+    
+    async def _agenerate_witness_introduction(self, witness: Witness) -> str:
+        """Async variant of _generate_witness_introduction"""
+        introduction = self.pregenerated.get(self.current_case.case_id, "intro", witness.name.lower())
+        if introduction is not None:
+            return introduction
+        return await self._ainvoke_llm(self._format_witness_introduction_prompt(witness), "intro")
+    
+    def _format_witness_introduction_prompt(self, witness: Witness) -> str:
+        """Build the court clerk prompt introducing a witness"""
+        return WITNESS_INTRODUCTION_PROMPT.format(
             witness_name=witness.name,
             witness_role=witness.role,
             witness_personality=witness.personality
         )
-        
-        response = self.groq_client.invoke([HumanMessage(content=formatted_prompt)])
-        return response.content
     
     def question_witness(self, question: str) -> Dict[str, Any]:
         """Ask a question to the current witness"""
-        if not self.game_state.current_witness:
-            return {"error": "No witness on the stand. Call a witness first."}
-        
-        if self.game_state.current_step >= self.game_state.max_steps:
-            return {"error": "Maximum steps reached. Game over."}
+        error = self._check_can_question()
+        if error:
+            return error
         
-        # Find the current witness
-        witness = next((w for w in self.current_case.witnesses if w.name.lower() == self.game_state.current_witness.lower()), None)
-        if not witness:
-            raise ValueError(f"Current witness not found")
+        witness = self._get_current_witness()
         
         # Retrieve relevant context
         context = self._retrieve_relevant_context(question, witness.name)
@@ -192,6 +377,107 @@ class CourtroomGameEngine:
         # Generate witness response
         response = self._generate_witness_response(question, witness, context)
         
+        return self._record_question(question, witness, context, response)
+    
+    async def aquestion_witness(self, question: str) -> Dict[str, Any]:
+        """Async variant of question_witness"""
+        error = self._check_can_question()
+        if error:
+            return error
+        
+        witness = self._get_current_witness()
+        # Embedding the question is CPU-bound, keep it off the event loop
+        context = await asyncio.to_thread(self._retrieve_relevant_context, question, witness.name)
+        response = await self._agenerate_witness_response(question, witness, context)
+        return self._record_question(question, witness, context, response)
+    
+    async def aquestion_witness_batch(self, questions: List[str]) -> List[Dict[str, Any]]:
+        """Ask the current witness several questions at once.
+        
+        Retrieval runs for all questions together and the LLM calls run
+        concurrently, then results are scored and counted as steps in order.
+        Questions beyond the remaining steps get an error payload, as do
+        questions whose LLM call failed, unless every call failed: that
+        error is raised, as question_witness raises it.
+        """
+        error = self._check_can_question()
+        if error:
+            return [error for _ in questions]
+        
+        witness = self._get_current_witness()
+        remaining_steps = self.game_state.max_steps - self.game_state.current_step
+        asked = questions[:remaining_steps]
+        
+        contexts = await asyncio.to_thread(self._retrieve_relevant_contexts, asked, witness.name)
+        responses = await asyncio.gather(
+            *(self._agenerate_witness_response(question, witness, context)
+              for question, context in zip(asked, contexts)),
+            return_exceptions=True
+        )
+        if all(isinstance(response, Exception) for response in responses):
+            raise responses[0]
+        
+        results = []
+        for question, context, response in zip(asked, contexts, responses):
+            if isinstance(response, Exception):
+                results.append({"error": str(response)})
+            else:
+                result = self._record_question(question, witness, context, response)
+                # The state as of this question, as later ones keep changing the live one
+                result["game_state"] = self.game_state.model_copy(deep=True)
+                results.append(result)
+        results.extend({"error": "Maximum steps reached. Game over."} for _ in questions[len(asked):])
+        return results
+    
+    async def astream_question_witness(self, question: str) -> AsyncIterator[Tuple[str, Any]]:
+        """Streaming variant of question_witness.
+
+        Yields ("token", text) for each completion token, then ("result", payload)
+        with the same payload question_witness returns.
+        """
+        error = self._check_can_question()
+        if error:
+            yield "result", error
+            return
+        
+        witness = self._get_current_witness()
+        context = await asyncio.to_thread(self._retrieve_relevant_context, question, witness.name)
+        
+        content = self._lookup_witness_answer(question, witness)
+        if content is not None:
+            yield "token", content
+        else:
+            tokens = []
+            with span("format_prompt"):
+                prompt = self._format_witness_prompt(question, witness, context)
+            async for token in self._astream_llm(prompt, "witness"):
+                tokens.append(token)
+                yield "token", token
+            content = "".join(tokens)
+            self._remember_witness_answer(question, witness, content)
+        
+        response = self._build_witness_response(question, witness, content)
+        yield "result", self._record_question(question, witness, context, response)
+    
+    def _check_can_question(self) -> Optional[Dict[str, Any]]:
+        """Return an error payload if a question cannot be asked right now"""
+        if not self.game_state.current_witness:
+            return {"error": "No witness on the stand. Call a witness first."}
+        
+        if self.game_state.current_step >= self.game_state.max_steps:
+            return {"error": "Maximum steps reached. Game over."}
+        
+        return None
+    
+    def _get_current_witness(self) -> Witness:
+        """Find the witness currently on the stand"""
+        witness = self.current_case.get_witness(self.game_state.current_witness)
+        if not witness:
+            raise ValueError(f"Current witness not found")
+        return witness
+    
+    def _record_question(self, question: str, witness: Witness, context: Dict[str, Any], response: AIResponse) -> Dict[str, Any]:
+        """Update the game state and score for an answered question"""
         # Update game state
         if witness.name not in self.game_state.witnesses_examined:
             self.game_state.witnesses_examined.append(witness.name)
@@ -199,7 +485,8 @@ class CourtroomGameEngine:
         self.game_state.current_step += 1
         
         # Award points based on question quality
-        points_earned = self._calculate_question_points(question, response, context)
+        with span("score"):
+            points_earned = self._calculate_question_points(question, response, context)
         self.game_state.player_score += points_earned
         
         return {
@@ -216,7 +503,7 @@ class CourtroomGameEngine:
         points = 5  # Base points for asking a question
         
         # Bonus for strategic questions
-        if any(keyword in question.lower() for keyword in ["alibi", "timeline", "opportunity", "reasonable doubt"]):
+        if "question" in self.current_case.keyword_matcher.match(question):
             points += 10
         
         # Bonus for questions that reveal clues
@@ -231,25 +518,46 @@ class CourtroomGameEngine:
     
     def use_evidence(self, evidence_id: str) -> Dict[str, Any]:
         """Present evidence to the court"""
+        evidence = self._present_evidence(evidence_id)
+        if isinstance(evidence, dict):
+            return evidence
+        
+        # Generate judge's response
+        judge_response = self._generate_judge_response(evidence)
+        
+        return self._record_evidence(evidence, judge_response)
+    
+    async def ause_evidence(self, evidence_id: str) -> Dict[str, Any]:
+        """Async variant of use_evidence"""
+        evidence = self._present_evidence(evidence_id)
+        if isinstance(evidence, dict):
+            return evidence
+        
+        judge_response = await self._agenerate_judge_response(evidence)
+        return self._record_evidence(evidence, judge_response)
+    
+    def _present_evidence(self, evidence_id: str):
+        """Mark evidence as presented, or return an error payload"""
         if self.game_state.current_step >= self.game_state.max_steps:
             return {"error": "Maximum steps reached. Game over."}
         
         # Find the evidence
-        evidence = next((e for e in self.current_case.evidence if e.id == evidence_id), None)
+        evidence = self.current_case.get_evidence(evidence_id)
         if not evidence:
             raise ValueError(f"Evidence {evidence_id} not found")
         
-        if evidence.presented:
+        if evidence.id in self.presented_evidence:
             return {"error": "Evidence already presented"}
         
         # Update game state
-        evidence.presented = True
-        self.game_state.evidence_presented.append(evidence_id)
+        self.presented_evidence.add(evidence.id)
+        self.game_state.evidence_presented.append(evidence.id)
         self.game_state.current_step += 1
-        
-        # Generate judge's response
-        judge_response = self._generate_judge_response(evidence)
-        
+        # This session's view of the shared evidence item
+        return evidence.model_copy(update={"presented": True})
+    
+    def _record_evidence(self, evidence: Evidence, judge_response: AIResponse) -> Dict[str, Any]:
+        """Award points for presented evidence"""
         # Award points and update score
         points_earned = evidence.points_value
         self.game_state.player_score += points_earned
@@ -267,13 +575,15 @@ class CourtroomGameEngine:
             return {"error": "Maximum steps reached. Game over."}
         
         # Find undiscovered clues
-        undiscovered_clues = [c for c in self.current_case.clues if not c.discovered]
+        undiscovered_clues = [c for c in self.current_case.clues if c.id not in self.discovered_clues]
         if not undiscovered_clues:
             return {"error": "No more clues available"}
         
         # Select the most relevant undiscovered clue
         clue = max(undiscovered_clues, key=lambda c: c.relevance_score)
-        clue.discovered = True
+        self.discovered_clues.add(clue.id)
+        # This session's view of the shared clue
+        clue = clue.model_copy(update={"discovered": True})
         
         # Update game state
         self.game_state.clues_discovered.append(clue.id)
@@ -291,23 +601,37 @@ class CourtroomGameEngine:
     
     def _retrieve_relevant_context(self, question: str, witness_name: str) -> Dict[str, Any]:
         """Retrieve relevant legal rules and case context"""
-        # Get legal context
-        legal_context = self.vector_store_manager.search_legal_knowledge(question, k=3)
-        
-        # Get case-specific context
-        case_context = self.vector_store_manager.search_case_data(
-            f"{witness_name} {question}", k=5
-        )
-        
-        return {
-            "legal_rules": legal_context,
-            "case_context": case_context,
-            "witness_info": self._get_witness_info(witness_name)
-        }
+        # Re-add the case index if it was evicted
+        case_id = self.current_case.case_id
+        if not self.vector_store_manager.has_case_data(case_id):
+            self._add_case_to_vector_store()
+        
+        # Legal and case-specific context, with both queries embedded together
+        with span("retrieve_context"):
+            context = self.vector_store_manager.search_context(
+                question, f"{witness_name} {question}", case_id, legal_k=3, case_k=5
+            )
+        context["witness_info"] = self._get_witness_info(witness_name)
+        return context
+    
+    def _retrieve_relevant_contexts(self, questions: List[str], witness_name: str) -> List[Dict[str, Any]]:
+        """_retrieve_relevant_context for several questions, embedding them all in one pass"""
+        case_id = self.current_case.case_id
+        if not self.vector_store_manager.has_case_data(case_id):
+            self._add_case_to_vector_store()
+        
+        with span("retrieve_context"):
+            contexts = self.vector_store_manager.search_contexts(
+                [(question, f"{witness_name} {question}") for question in questions], case_id, legal_k=3, case_k=5
+            )
+        witness_info = self._get_witness_info(witness_name)
+        for context in contexts:
+            context["witness_info"] = witness_info
+        return contexts
     
     def _get_witness_info(self, witness_name: str) -> Dict[str, Any]:
         """Get detailed information about a witness"""
-        witness = next((w for w in self.current_case.witnesses if w.name.lower() == witness_name.lower()), None)
+        witness = self.current_case.get_witness(witness_name)
         if witness:
             return {
                 "name": witness.name,
@@ -323,25 +647,44 @@ class CourtroomGameEngine:
     
     def _generate_witness_response(self, question: str, witness: Witness, context: Dict[str, Any]) -> AIResponse:
         """Generate a realistic witness response using AI"""
-        prompt = PromptTemplate(
-            input_variables=["witness_name", "witness_role", "witness_personality", "witness_testimony", "question", "legal_context", "case_context"],
-            template="""
-            You are {witness_name}, a witness in a criminal trial.
-            
-            Your role: {witness_role}
-            Your personality: {witness_personality}
-            Your testimony: {witness_testimony}
-            
-            Question from the attorney: {question}
-            
-            Legal context: {legal_context}
-            Case context: {case_context}
-            
-            Respond as this witness would, considering their personality and role. Be realistic and consistent with their testimony. If the question reveals important information that could help the case, indicate this subtly.
-            """
-        )
-        
-        formatted_prompt = prompt.format(
+        content = self._lookup_witness_answer(question, witness)
+        if content is None:
+            with span("format_prompt"):
+                prompt = self._format_witness_prompt(question, witness, context)
+            content = self._invoke_llm(prompt, "witness")
+            self._remember_witness_answer(question, witness, content)
+        return self._build_witness_response(question, witness, content)
+    
+    async def _agenerate_witness_response(self, question: str, witness: Witness, context: Dict[str, Any]) -> AIResponse:
+        """Async variant of _generate_witness_response"""
+        content = self._lookup_witness_answer(question, witness)
+        if content is None:
+            with span("format_prompt"):
+                prompt = self._format_witness_prompt(question, witness, context)
+            content = await self._ainvoke_llm(prompt, "witness")
+            self._remember_witness_answer(question, witness, content)
+        return self._build_witness_response(question, witness, content)
+    
+    def _lookup_witness_answer(self, question: str, witness: Witness) -> Optional[str]:
+        """Return a cached answer this witness gave to a near-identical question"""
+        if not witness.cache_responses:
+            return None
+        with span("cache_lookup"):
+            return self.response_cache.lookup(
+                self.current_case.case_id, witness.name, question, self.vector_store_manager.embed_query(question)
+            )
+    
+    def _remember_witness_answer(self, question: str, witness: Witness, content: str):
+        """Cache a freshly generated witness answer"""
+        if witness.cache_responses:
+            self.response_cache.store(
+                self.current_case.case_id, witness.name, question,
+                self.vector_store_manager.embed_query(question), content
+            )
+    
+    def _format_witness_prompt(self, question: str, witness: Witness, context: Dict[str, Any]) -> str:
+        """Build the prompt for a witness answering a question"""
+        return WITNESS_PROMPT.format(
             witness_name=witness.name,
             witness_role=witness.role,
             witness_personality=witness.personality,
@@ -350,15 +693,16 @@ class CourtroomGameEngine:
             legal_context=str(context.get("legal_rules", [])),
             case_context=str(context.get("case_context", []))
         )
-        
-        response = self.groq_client.invoke([HumanMessage(content=formatted_prompt)])
-        
+    
+    def _build_witness_response(self, question: str, witness: Witness, content: str) -> AIResponse:
+        """Wrap a witness completion, checking it for revealed clues"""
         # Check if response reveals a clue
-        clue_revealed = self._check_clue_revelation(question, response.content)
+        with span("clue_check"):
+            clue_revealed = self._check_clue_revelation(question, content)
         
         return AIResponse(
             speaker=witness.name,
-            content=response.content,
+            content=content,
             emotion=self._determine_emotion(witness.personality),
             confidence=witness.credibility,
             reveals_clue=clue_revealed["reveals"],
@@ -368,17 +712,12 @@ class CourtroomGameEngine:
     
     def _check_clue_revelation(self, question: str, response: str) -> Dict[str, Any]:
         """Check if the response reveals a clue"""
-        # Simple keyword-based clue detection
-        clue_keywords = {
-            "C1": ["unlocked", "kitchen door", "access"],
-            "C2": ["thompson", "hurrying", "8:55", "bag"],
-            "C3": ["glove", "size 9", "size 11", "hand size"],
-            "C4": ["security guard", "away", "10 minutes", "post"]
-        }
+        # Keyword-based clue detection, in a single pass over the response
+        matches = self.current_case.keyword_matcher.match(response)
         
-        for clue_id, keywords in clue_keywords.items():
-            if any(keyword.lower() in response.lower() for keyword in keywords):
-                return {"reveals": True, "clue_id": clue_id}
+        for clue in self.current_case.clues:
+            if f"clue:{clue.id}" in matches:
+                return {"reveals": True, "clue_id": clue.id}
         
         return {"reveals": False, "clue_id": None}
     
@@ -397,36 +736,78 @@ class CourtroomGameEngine:
     
     def _generate_judge_response(self, evidence: Evidence) -> AIResponse:
         """Generate judge's response to evidence presentation"""
-        prompt = PromptTemplate(
-            input_variables=["evidence_name", "evidence_description", "evidence_relevance"],
-            template="""
-            You are a judge presiding over a criminal trial. The defense attorney has presented evidence.
-            
-            Evidence: {evidence_name}
-            Description: {evidence_description}
-            Relevance: {evidence_relevance}
-            
-            Provide a brief response acknowledging the evidence and its admissibility. Be judicial and neutral.
-            """
-        )
-        
-        formatted_prompt = prompt.format(
+        content = self.pregenerated.get(self.current_case.case_id, "evidence", evidence.id)
+        if content is None:
+            content = self._invoke_llm(self._format_judge_evidence_prompt(evidence), "judge_evidence")
+        return self._build_judge_response(content)
+    
+    async def _agenerate_judge_response(self, evidence: Evidence) -> AIResponse:
+        """Async variant of _generate_judge_response"""
+        content = self.pregenerated.get(self.current_case.case_id, "evidence", evidence.id)
+        if content is None:
+            content = await self._ainvoke_llm(self._format_judge_evidence_prompt(evidence), "judge_evidence")
+        return self._build_judge_response(content)
+    
+    def _format_judge_evidence_prompt(self, evidence: Evidence) -> str:
+        """Build the prompt for the judge acknowledging evidence"""
+        return JUDGE_EVIDENCE_PROMPT.format(
             evidence_name=evidence.name,
             evidence_description=evidence.description,
             evidence_relevance=evidence.relevance
         )
-        
-        response = self.groq_client.invoke([HumanMessage(content=formatted_prompt)])
-        
+    
+    def _build_judge_response(self, content: str) -> AIResponse:
+        """Wrap a judge completion"""
         return AIResponse(
             speaker="Judge",
-            content=response.content,
+            content=content,
             emotion="authoritative",
             confidence=0.9
         )
     
     def get_verdict(self) -> Verdict:
         """Generate the final verdict"""
+        verdict_context = self._prepare_verdict()
+        
+        try:
+            reasoning = self._invoke_llm(verdict_context["prompt"], "verdict")
+        except Exception as e:
+            # Fallback reasoning if AI call fails
+            reasoning = self._fallback_verdict_reasoning(verdict_context["won_case"])
+        
+        return self._build_verdict(verdict_context, reasoning)
+    
+    async def aget_verdict(self) -> Verdict:
+        """Async variant of get_verdict"""
+        verdict_context = self._prepare_verdict()
+        
+        try:
+            reasoning = await self._ainvoke_llm(verdict_context["prompt"], "verdict")
+        except Exception as e:
+            reasoning = self._fallback_verdict_reasoning(verdict_context["won_case"])
+        
+        return self._build_verdict(verdict_context, reasoning)
+    
+    async def astream_verdict(self) -> AsyncIterator[Tuple[str, Any]]:
+        """Streaming variant of get_verdict.
+
+        Yields ("token", text) for each token of the reasoning, then ("result", Verdict).
+        """
+        verdict_context = self._prepare_verdict()
+        
+        tokens = []
+        try:
+            async for token in self._astream_llm(verdict_context["prompt"], "verdict"):
+                tokens.append(token)
+                yield "token", token
+            reasoning = "".join(tokens)
+        except Exception as e:
+            reasoning = self._fallback_verdict_reasoning(verdict_context["won_case"])
+        
+        yield "result", self._build_verdict(verdict_context, reasoning)
+    
+    def _prepare_verdict(self) -> Dict[str, Any]:
+        """End the game and gather everything the verdict is based on"""
         if not self.game_state or not self.current_case:
             raise ValueError("No active case or game state")
             
@@ -439,7 +820,7 @@ class CourtroomGameEngine:
         witness_credibility = {}
         
         for evidence in self.current_case.evidence:
-            if evidence.presented:
+            if evidence.id in self.presented_evidence:
                 evidence_weight[evidence.id] = evidence.relevance
         
         for witness in self.current_case.witnesses:
@@ -450,24 +831,7 @@ class CourtroomGameEngine:
         won_case = self._check_win_conditions()
         
         # Generate verdict reasoning
-        prompt = PromptTemplate(
-            input_variables=["case_summary", "evidence_weight", "witness_credibility", "clues_discovered", "player_score", "won_case"],
-            template="""
-            You are a judge delivering a verdict in a criminal trial.
-            
-            Case summary: {case_summary}
-            Evidence presented: {evidence_weight}
-            Witness credibility: {witness_credibility}
-            Clues discovered: {clues_discovered}
-            Player performance score: {player_score}
-            Defense won: {won_case}
-            
-            Based on the evidence and the defense attorney's performance, deliver a reasoned verdict (guilty or not guilty)
-            with detailed reasoning. Consider the burden of proof and reasonable doubt.
-            """
-        )
-        
-        formatted_prompt = prompt.format(
+        formatted_prompt = VERDICT_PROMPT.format(
             case_summary=self.game_state.case_summary,
             evidence_weight=str(evidence_weight),
             witness_credibility=str(witness_credibility),
@@ -476,12 +840,22 @@ class CourtroomGameEngine:
             won_case=won_case
         )
         
-        try:
-            response = self.groq_client.invoke([HumanMessage(content=formatted_prompt)])
-            reasoning = response.content
-        except Exception as e:
-            # Fallback reasoning if AI call fails
-            reasoning = f"Based on the evidence presented and the defense attorney's performance (score: {self.game_state.player_score}), the court finds the defendant {'NOT GUILTY' if won_case else 'GUILTY'}."
+        return {
+            "prompt": formatted_prompt,
+            "evidence_weight": evidence_weight,
+            "witness_credibility": witness_credibility,
+            "won_case": won_case
+        }
+    
+    def _fallback_verdict_reasoning(self, won_case: bool) -> str:
+        """Verdict reasoning used when the AI call fails"""
+        return f"Based on the evidence presented and the defense attorney's performance (score: {self.game_state.player_score}), the court finds the defendant {'NOT GUILTY' if won_case else 'GUILTY'}."
+    
+    def _build_verdict(self, verdict_context: Dict[str, Any], reasoning: str) -> Verdict:
+        """Assemble the verdict from its context and the judge's reasoning"""
+        evidence_weight = verdict_context["evidence_weight"]
+        witness_credibility = verdict_context["witness_credibility"]
+        won_case = verdict_context["won_case"]
         
         # Determine guilty verdict based on win conditions
         guilty = not won_case
@@ -527,6 +901,51 @@ class CourtroomGameEngine:
         """Get current game state"""
         return self.game_state
     
+    def export_session(self) -> Dict[str, Any]:
+        """This session's progress as JSON-compatible data, without anything the case template holds"""
+        return {
+            "game_state": self.game_state.model_dump(mode="json", exclude={"case_summary"}) if self.game_state else None,
+            "presented_evidence": sorted(self.presented_evidence),
+            "discovered_clues": sorted(self.discovered_clues),
+            "conversation_history": self.conversation_history,
+            "state_version": self.state_version
+        }
+    
+    def restore_session(self, data: Dict[str, Any]):
+        """Resume a session exported by export_session"""
+        state = data["game_state"]
+        if state is None:
+            return
+        self.current_case = CASE_DATABASE[state["case_id"]]
+        self.game_state = GameState(case_summary=self.current_case.description, **state)
+        self.presented_evidence = set(data["presented_evidence"])
+        self.discovered_clues = set(data["discovered_clues"])
+        self.conversation_history = data["conversation_history"]
+        # Versions keep counting from the saved one; with no snapshots kept here
+        # yet, clients holding an older version are sent the full state
+        self.state_version = data.get("state_version", 0)
+        self._state_history.clear()
+        # The case index is re-added on the first retrieval if this process has not built it
+        if not self.pregenerated.is_scheduled(self.current_case.case_id):
+            self.pregenerated.schedule_case(
+                self.current_case.case_id, self._pregeneration_prompts(self.current_case), self._pregenerate_llm
+            )
+    
+    def versioned_state(self) -> Tuple[int, Dict[str, Any]]:
+        """Current game state as a dict with its version, bumping the version if the state changed"""
+        state = self.game_state.model_dump(mode="json")
+        if not self._state_history or self._state_history[-1][1] != state:
+            self.state_version += 1
+            self._state_history.append((self.state_version, state))
+        return self.state_version, state
+    
+    def state_delta(self, since_version: int, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fields of state that differ from the snapshot at since_version, or None if it is no longer kept"""
+        for version, previous in self._state_history:
+            if version == since_version:
+                return {key: value for key, value in state.items() if previous.get(key) != value}
+        return None
+    
     def get_available_actions(self) -> List[str]:
         """Get available actions for the current turn"""
         return self.game_state.available_actions
@@ -544,10 +963,42 @@ class CourtroomGameEngine:
             "objective": self.current_case.objective,
             "witnesses": [w.name for w in self.current_case.witnesses],
             "evidence": [e.name for e in self.current_case.evidence],
-            "clues": [c.description for c in self.current_case.clues if c.discovered],
+            "clues": [c.description for c in self.current_case.clues if c.id in self.discovered_clues],
             "game_state": self.game_state.dict()
         }
     
+    def get_witness_names(self) -> List[str]:
+        """Names of the current case's witnesses"""
+        return [w.name for w in self.current_case.witnesses]
+    
+    def get_evidence_list(self) -> List[Dict[str, Any]]:
+        """The current case's evidence with this session's presented flags"""
+        return [
+            {
+                "id": evidence.id,
+                "name": evidence.name,
+                "description": evidence.description,
+                "presented": evidence.id in self.presented_evidence,
+                "points_value": evidence.points_value
+            }
+            for evidence in self.current_case.evidence
+        ]
+    
+    def get_bootstrap(self) -> Dict[str, Any]:
+        """Everything the UI needs to render a newly started game"""
+        return {
+            "case": {
+                "case_id": self.current_case.case_id,
+                "title": self.current_case.title,
+                "description": self.current_case.description,
+                "charges": self.current_case.charges,
+                "objective": self.current_case.objective
+            },
+            "witnesses": self.get_witness_names(),
+            "evidence": self.get_evidence_list(),
+            "available_actions": self.game_state.available_actions
+        }
+    
     def chat_with_judge(self, statement: str) -> Dict[str, Any]:
         """Chat directly with the judge for legal advice and points"""
         if self.game_state.current_step >= self.game_state.max_steps:
@@ -556,6 +1007,32 @@ class CourtroomGameEngine:
         # Generate judge's response and evaluate statement
         judge_response = self._generate_judge_chat_response(statement)
         
+        return self._record_judge_chat(statement, judge_response)
+    
+    async def achat_with_judge(self, statement: str) -> Dict[str, Any]:
+        """Async variant of chat_with_judge"""
+        if self.game_state.current_step >= self.game_state.max_steps:
+            return {"error": "Maximum steps reached. Game over."}
+        
+        judge_response = await self._agenerate_judge_chat_response(statement)
+        return self._record_judge_chat(statement, judge_response)
+    
+    async def astream_chat_with_judge(self, statement: str) -> AsyncIterator[Tuple[str, Any]]:
+        """Streaming variant of chat_with_judge, yielding tokens then the result payload"""
+        if self.game_state.current_step >= self.game_state.max_steps:
+            yield "result", {"error": "Maximum steps reached. Game over."}
+            return
+        
+        tokens = []
+        async for token in self._astream_llm(self._format_judge_chat_prompt(statement), "judge_chat"):
+            tokens.append(token)
+            yield "token", token
+        
+        judge_response = self._build_judge_response("".join(tokens))
+        yield "result", self._record_judge_chat(statement, judge_response)
+    
+    def _record_judge_chat(self, statement: str, judge_response: AIResponse) -> Dict[str, Any]:
+        """Score a legal statement made to the judge"""
         # Calculate points for valid legal statements
         points_earned = self._evaluate_legal_statement(statement)
         
@@ -571,65 +1048,34 @@ class CourtroomGameEngine:
     
     def _generate_judge_chat_response(self, statement: str) -> AIResponse:
         """Generate judge's response to legal statements"""
-        prompt = PromptTemplate(
-            input_variables=["statement", "case_context"],
-            template="""
-            You are a judge in a criminal trial. A defense attorney is making a legal statement to you.
-            
-            Attorney's statement: {statement}
-            Case context: {case_context}
-            
-            Provide a brief, judicial response. Be authoritative but helpful. If the statement shows good legal understanding, acknowledge it. If it's incorrect, gently correct it.
-            """
-        )
-        
-        formatted_prompt = prompt.format(
+        return self._build_judge_response(self._invoke_llm(self._format_judge_chat_prompt(statement), "judge_chat"))
+    
+    async def _agenerate_judge_chat_response(self, statement: str) -> AIResponse:
+        """Async variant of _generate_judge_chat_response"""
+        return self._build_judge_response(await self._ainvoke_llm(self._format_judge_chat_prompt(statement), "judge_chat"))
+    
+    def _format_judge_chat_prompt(self, statement: str) -> str:
+        """Build the prompt for the judge answering a legal statement"""
+        return JUDGE_CHAT_PROMPT.format(
             statement=statement,
             case_context=self.game_state.case_summary
         )
-        
-        response = self.groq_client.invoke([HumanMessage(content=formatted_prompt)])
-        
-        return AIResponse(
-            speaker="Judge",
-            content=response.content,
-            emotion="authoritative",
-            confidence=0.9
-        )
     
     def _evaluate_legal_statement(self, statement: str) -> int:
         """Evaluate legal statement and award points"""
         points = 0
         
-        # Legal keywords that indicate good understanding
-        legal_keywords = [
-            "reasonable doubt", "burden of proof", "alibi", "evidence", 
-            "witness credibility", "circumstantial evidence", "opportunity",
-            "motive", "timeline", "objection", "hearsay", "admissible",
-            "cross-examination", "direct examination", "impeachment"
-        ]
-        
-        # Case-specific keywords
-        case_keywords = [
-            "carlos rivera", "necklace", "theft", "gala", "kitchen",
-            "security footage", "glove", "thompson", "unlocked door"
-        ]
+        # Legal, case-specific and strategic keywords, found in a single pass
+        matches = self.current_case.keyword_matcher.match(statement)
         
         # Award points for legal knowledge
-        for keyword in legal_keywords:
-            if keyword.lower() in statement.lower():
-                points += 5
+        points += 5 * len(matches.get("legal", ()))
         
         # Award points for case-specific knowledge
-        for keyword in case_keywords:
-            if keyword.lower() in statement.lower():
-                points += 3
+        points += 3 * len(matches.get("case", ()))
         
         # Bonus for strategic thinking
-        if any(phrase in statement.lower() for phrase in [
-            "reasonable doubt", "prove innocence", "alternative suspect",
-            "lack of evidence", "timeline inconsistency"
-        ]):
+        if "strategic" in matches:
             points += 10
         
         # Cap points to prevent abuse
@@ -0,0 +1,68 @@
+import re
+from typing import Dict, Iterable, List, Set
+
+# Question topics that earn a strategy bonus
+STRATEGIC_QUESTION_KEYWORDS = ["alibi", "timeline", "opportunity", "reasonable doubt"]
+
+# Legal keywords that indicate good understanding
+LEGAL_KEYWORDS = [
+    "reasonable doubt", "burden of proof", "alibi", "evidence",
+    "witness credibility", "circumstantial evidence", "opportunity",
+    "motive", "timeline", "objection", "hearsay", "admissible",
+    "cross-examination", "direct examination", "impeachment"
+]
+
+# Phrases that show strategic thinking in a legal statement
+STRATEGIC_PHRASES = [
+    "reasonable doubt", "prove innocence", "alternative suspect",
+    "lack of evidence", "timeline inconsistency"
+]
+
+
+class KeywordMatcher:
+    """Finds every keyword from several named groups in one pass over a text.
+
+    All keywords are compiled into a single case-insensitive regex of the form
+    ``(?=(kw1|kw2|...))``, tried at every position of the text. Alternatives are
+    ordered longest first, so at each position the longest keyword matches; any
+    shorter keywords that are prefixes of it are added from a precomputed table.
+    This finds the same keywords as testing each one with ``in`` separately.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self._groups_by_keyword: Dict[str, List[str]] = {}
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword:
+                    self._groups_by_keyword.setdefault(keyword, []).append(group)
+
+        keywords = sorted(self._groups_by_keyword, key=len, reverse=True)
+        self._prefixes: Dict[str, List[str]] = {
+            keyword: [other for other in keywords if other != keyword and keyword.startswith(other)]
+            for keyword in keywords
+        }
+        self._pattern = (
+            re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in keywords) + "))", re.IGNORECASE)
+            if keywords else None
+        )
+
+    def find_keywords(self, text: str) -> Set[str]:
+        """Every keyword that occurs in the text"""
+        found: Set[str] = set()
+        if self._pattern is None:
+            return found
+        for match in self._pattern.finditer(text):
+            keyword = match.group(1).lower()
+            if keyword not in found and keyword in self._prefixes:
+                found.add(keyword)
+                found.update(self._prefixes[keyword])
+        return found
+
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """Keywords found in the text, grouped by the groups they belong to"""
+        matches: Dict[str, Set[str]] = {}
+        for keyword in self.find_keywords(text):
+            for group in self._groups_by_keyword[keyword]:
+                matches.setdefault(group, set()).add(keyword)
+        return matches
@@ -0,0 +1,307 @@
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+
+from metrics import LLM_RETRIES
+
+# Every prompt type the engine sends, used for per-type settings such as LLM_MODEL_INTRO
+PROMPT_TYPES = ("witness", "intro", "judge_evidence", "judge_chat", "verdict")
+
+DEFAULT_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+# Groq's OpenAI-compatible API. Point it at benchmarks/mock_llm_server.py to run offline.
+DEFAULT_BASE_URL = "https://api.groq.com/openai/v1"
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _per_prompt_type(name: str, default: str) -> Dict[str, str]:
+    """Read NAME_<PROMPT_TYPE> for each prompt type, falling back to NAME, then default"""
+    fallback = os.getenv(name, default)
+    return {prompt_type: os.getenv(f"{name}_{prompt_type.upper()}", fallback) for prompt_type in PROMPT_TYPES}
+
+
+class Completion:
+    """Text from the model, with token usage when the provider reports it.
+
+    Streaming yields one Completion per token, and usage only on the last one.
+    """
+
+    __slots__ = ("content", "prompt_tokens", "completion_tokens")
+
+    def __init__(self, content: str, prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None):
+        self.content = content
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class LLMProvider:
+    """Sends prompts to a chat model. One provider is shared by every session."""
+
+    def complete(self, prompt: str, prompt_type: str) -> Completion:
+        raise NotImplementedError
+
+    async def acomplete(self, prompt: str, prompt_type: str) -> Completion:
+        raise NotImplementedError
+
+    def astream(self, prompt: str, prompt_type: str) -> AsyncIterator[Completion]:
+        raise NotImplementedError
+
+    def model_for(self, prompt_type: str) -> str:
+        return ""
+
+    async def aclose(self):
+        pass
+
+
+class LangChainProvider(LLMProvider):
+    """Wraps a LangChain chat model, such as ChatGroq or the benchmark fakes"""
+
+    def __init__(self, chat_model):
+        self.chat_model = chat_model
+
+    @staticmethod
+    def _messages(prompt: str):
+        from langchain.schema import HumanMessage
+        return [HumanMessage(content=prompt)]
+
+    @staticmethod
+    def _completion(result) -> Completion:
+        token_usage = (result.llm_output or {}).get("token_usage") or {}
+        return Completion(
+            result.generations[0][0].message.content,
+            token_usage.get("prompt_tokens"),
+            token_usage.get("completion_tokens")
+        )
+
+    def complete(self, prompt: str, prompt_type: str) -> Completion:
+        # generate rather than invoke, as only it reports token usage
+        return self._completion(self.chat_model.generate([self._messages(prompt)]))
+
+    async def acomplete(self, prompt: str, prompt_type: str) -> Completion:
+        return self._completion(await self.chat_model.agenerate([self._messages(prompt)]))
+
+    async def astream(self, prompt: str, prompt_type: str) -> AsyncIterator[Completion]:
+        async for chunk in self.chat_model.astream(self._messages(prompt)):
+            if chunk.content:
+                yield Completion(chunk.content)
+
+    def model_for(self, prompt_type: str) -> str:
+        return getattr(self.chat_model, "model_name", type(self.chat_model).__name__)
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Calls an OpenAI-compatible chat completions API over pooled keep-alive connections.
+
+    Each prompt type can use its own model and timeout, e.g. LLM_MODEL_INTRO or
+    LLM_TIMEOUT_SECONDS_VERDICT. Connection errors and 429/5xx responses are
+    retried up to ``max_retries`` times with exponential backoff and full
+    jitter, honouring Retry-After. Streams are only retried before their first
+    token.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None,
+                 max_retries: Optional[int] = None, backoff_seconds: Optional[float] = None,
+                 max_connections: Optional[int] = None):
+        self.base_url = (base_url or os.getenv("LLM_BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.api_key = api_key or os.getenv("LLM_API_KEY") or os.getenv("GROQ_API_KEY", "")
+        self.models = _per_prompt_type("LLM_MODEL", DEFAULT_MODEL)
+        self.timeouts = {
+            prompt_type: float(seconds)
+            for prompt_type, seconds in _per_prompt_type("LLM_TIMEOUT_SECONDS", "30").items()
+        }
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_MAX_RETRIES", "3"))
+        self.backoff_seconds = backoff_seconds or float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "0.5"))
+        self.max_backoff_seconds = float(os.getenv("LLM_RETRY_MAX_BACKOFF_SECONDS", "8"))
+
+        max_connections = max_connections or int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_SECONDS", "60"))
+        )
+        self._headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        self._limits = limits
+        # Created once and reused, so calls skip the TCP and TLS handshake
+        self._client = httpx.Client(base_url=self.base_url, headers=self._headers, limits=limits)
+        # event loop -> (async client, task closing it), as pooled connections cannot move between loops
+        self._async_clients: Dict[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Task]] = {}
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """The async client of the running event loop, closed before that loop is"""
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(loop)
+        if entry is None:
+            client = httpx.AsyncClient(base_url=self.base_url, headers=self._headers, limits=self._limits)
+            entry = self._async_clients[loop] = (client, loop.create_task(self._close_with_loop(loop, client)))
+        return entry[0]
+
+    async def _close_with_loop(self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient):
+        """Wait until cancelled, then close the client.
+
+        asyncio.run() cancels the tasks still pending when its main coroutine
+        returns and runs them before closing the loop, so the client's sockets
+        are closed while the loop can still do it. Once the loop is closed
+        they would only be released by the garbage collector.
+        """
+        try:
+            await loop.create_future()
+        finally:
+            if self._async_clients.get(loop, (None,))[0] is client:
+                del self._async_clients[loop]
+            await client.aclose()
+
+    def model_for(self, prompt_type: str) -> str:
+        return self.models.get(prompt_type, self.models["witness"])
+
+    def _timeout(self, prompt_type: str) -> httpx.Timeout:
+        return httpx.Timeout(self.timeouts.get(prompt_type, 30.0), connect=5.0)
+
+    def _payload(self, prompt: str, prompt_type: str, stream: bool = False) -> Dict[str, Any]:
+        payload = {"model": self.model_for(prompt_type), "messages": [{"role": "user", "content": prompt}]}
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.max_backoff_seconds)
+                except ValueError:
+                    pass
+        return random.uniform(0, min(self.backoff_seconds * 2 ** attempt, self.max_backoff_seconds))
+
+    def _should_retry(self, attempt: int, prompt_type: str, error: Optional[Exception],
+                      response: Optional[httpx.Response]) -> bool:
+        """Whether to retry after a failed attempt, counting the retry"""
+        if attempt >= self.max_retries:
+            return False
+        if isinstance(error, httpx.TransportError):
+            reason = type(error).__name__
+        elif response is not None and response.status_code in RETRY_STATUS_CODES:
+            reason = str(response.status_code)
+        else:
+            return False
+        LLM_RETRIES.inc(prompt_type=prompt_type, reason=reason)
+        return True
+
+    @staticmethod
+    def _completion(body: Dict[str, Any]) -> Completion:
+        usage = body.get("usage") or {}
+        return Completion(
+            body["choices"][0]["message"]["content"],
+            usage.get("prompt_tokens"),
+            usage.get("completion_tokens")
+        )
+
+    def complete(self, prompt: str, prompt_type: str) -> Completion:
+        payload = self._payload(prompt, prompt_type)
+        for attempt in range(self.max_retries + 1):
+            response, error = None, None
+            try:
+                response = self._client.post("/chat/completions", json=payload, timeout=self._timeout(prompt_type))
+                if response.status_code < 400:
+                    return self._completion(response.json())
+            except httpx.TransportError as e:
+                error = e
+            if not self._should_retry(attempt, prompt_type, error, response):
+                break
+            time.sleep(self._backoff(attempt, response))
+        if error is not None:
+            raise error
+        response.raise_for_status()
+
+    async def acomplete(self, prompt: str, prompt_type: str) -> Completion:
+        payload = self._payload(prompt, prompt_type)
+        for attempt in range(self.max_retries + 1):
+            response, error = None, None
+            try:
+                response = await self._get_async_client().post(
+                    "/chat/completions", json=payload, timeout=self._timeout(prompt_type)
+                )
+                if response.status_code < 400:
+                    return self._completion(response.json())
+            except httpx.TransportError as e:
+                error = e
+            if not self._should_retry(attempt, prompt_type, error, response):
+                break
+            await asyncio.sleep(self._backoff(attempt, response))
+        if error is not None:
+            raise error
+        response.raise_for_status()
+
+    async def astream(self, prompt: str, prompt_type: str) -> AsyncIterator[Completion]:
+        payload = self._payload(prompt, prompt_type, stream=True)
+        streamed = False
+        for attempt in range(self.max_retries + 1):
+            response, error = None, None
+            try:
+                async with self._get_async_client().stream(
+                    "POST", "/chat/completions", json=payload, timeout=self._timeout(prompt_type)
+                ) as response:
+                    if response.status_code < 400:
+                        async for completion in self._parse_stream(response.aiter_lines()):
+                            streamed = True
+                            yield completion
+                        return
+                    await response.aread()
+            except httpx.TransportError as e:
+                if streamed:
+                    # Tokens already reached the caller, a retry would repeat them
+                    raise
+                error = e
+            if not self._should_retry(attempt, prompt_type, error, response):
+                break
+            await asyncio.sleep(self._backoff(attempt, response))
+        if error is not None:
+            raise error
+        response.raise_for_status()
+
+    @staticmethod
+    async def _parse_stream(lines: AsyncIterator[str]) -> AsyncIterator[Completion]:
+        """Completions from Server-Sent Event lines of a streamed chat completion"""
+        async for line in lines:
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                return
+            chunk = json.loads(data)
+            choices = chunk.get("choices") or [{}]
+            content = (choices[0].get("delta") or {}).get("content") or ""
+            # OpenAI sends usage on the last chunk, Groq under x_groq
+            usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+            if usage:
+                yield Completion(content, usage.get("prompt_tokens"), usage.get("completion_tokens"))
+            elif content:
+                yield Completion(content)
+
+    def close(self):
+        self._client.close()
+
+    async def aclose(self):
+        self._client.close()
+        loop = asyncio.get_running_loop()
+        for client_loop, (_, closer) in list(self._async_clients.items()):
+            if client_loop is loop:
+                closer.cancel()
+                await asyncio.gather(closer, return_exceptions=True)
+            elif not client_loop.is_closed():
+                client_loop.call_soon_threadsafe(closer.cancel)
+
+
+def create_provider() -> LLMProvider:
+    """The provider selected by LLM_PROVIDER: "openai" (default) or "groq", through LangChain's ChatGroq"""
+    if os.getenv("LLM_PROVIDER", "openai").lower() == "groq":
+        from langchain_groq import ChatGroq
+        return LangChainProvider(ChatGroq(
+            groq_api_key=os.getenv("GROQ_API_KEY"),
+            model_name=os.getenv("LLM_MODEL", DEFAULT_MODEL)
+        ))
+    return OpenAICompatibleProvider()
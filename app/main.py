@@ -1,12 +1,26 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
+from fastapi.routing import APIRoute
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Callable, Tuple
 import os
+import asyncio
+import struct
 from dotenv import load_dotenv
 
 from game_engine import CourtroomGameEngine
-from models import GameState, PlayerAction, GameResponse, CaseData
+from session_manager import SessionManager
+from session_store import MemorySessionStore, SessionConflictError, SESSION_SNAPSHOT_PATH
+from models import GameState, PlayerAction, GameResponse, CaseData, CompactGameResponse
+from case_data import CASE_DATABASE
+from embeddings import get_embeddings, get_embedding_stats
+from metrics import MetricsMiddleware, CallbackMetric, render_metrics
+from tracing import TracingMiddleware, span, slowest_requests, PROFILE_SLOWEST
+from warmup import WarmupProgress
+from responses import FastJSONResponse, dump_json
 
 load_dotenv()
 
@@ -16,6 +30,42 @@ app = FastAPI(
     version="1.0.0"
 )
 
+class SessionRoute(APIRoute):
+    """Saves the calling player's session to the session store once the route has run.
+
+    Routes resolving a session record it in ``request.state.session``. A
+    session saved by another request in the meantime gives a 409, and the
+    player should retry. Streams are saved after their last event. A route
+    that fails saves nothing, and its unsaved changes are dropped from the
+    cached engine.
+    """
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        
+        async def route_handler(request: Request) -> Response:
+            try:
+                response = await handler(request)
+            except Exception:
+                session = getattr(request.state, "session", None)
+                if session is not None:
+                    await run_in_threadpool(session_manager.discard_changes, *session)
+                raise
+            session = getattr(request.state, "session", None)
+            if session is None:
+                return response
+            if isinstance(response, StreamingResponse):
+                response.body_iterator = _save_after_stream(response.body_iterator, *session)
+                return response
+            try:
+                await run_in_threadpool(session_manager.save_session, *session)
+            except SessionConflictError as e:
+                return JSONResponse({"detail": str(e)}, status_code=409)
+            return response
+        
+        return route_handler
+
+app.router.route_class = SessionRoute
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -23,10 +73,229 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Session-ID", "Server-Timing", "X-Trace-ID"],
 )
 
-# Initialize game engine
-game_engine = CourtroomGameEngine()
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """Gzip large responses, except Server-Sent Event streams which must not be buffered"""
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1024")))
+app.add_middleware(TracingMiddleware)
+# Outermost, so timings include compression
+app.add_middleware(MetricsMiddleware)
+
+# Per-player game sessions sharing one LLM client and vector store, built by the warm-up
+session_manager = SessionManager()
+warmup = WarmupProgress()
+WARMUP_RETRY_AFTER_SECONDS = os.getenv("WARMUP_RETRY_AFTER_SECONDS", "5")
+
+def _build_case_indexes():
+    for case_id in CASE_DATABASE:
+        session_manager.shared_engine.new_session().start_case(case_id)
+
+def warm_up_steps() -> List[Tuple[str, Callable[[], Any]]]:
+    """The steps loading everything the game routes need, slowest first"""
+    steps = []
+    if not session_manager.has_shared_engine():
+        steps.append(("embedding_model", get_embeddings))
+    steps.append(("engine", lambda: session_manager.shared_engine))
+    steps.append(("case_indexes", _build_case_indexes))
+    return steps
+
+@app.on_event("startup")
+async def start_warm_up():
+    """Warm up in the background, so the server binds and answers /healthz straight away"""
+    warmup.start(warm_up_steps())
+
+SESSION_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SESSION_SNAPSHOT_INTERVAL_SECONDS", "60"))
+# Workers each hold their own memory sessions, so they would overwrite each
+# other's snapshot and each restore the games of all of them
+SNAPSHOT_SESSIONS = bool(SESSION_SNAPSHOT_PATH) and int(os.getenv("WEB_CONCURRENCY", "1")) <= 1
+_snapshot_task: Optional[asyncio.Task] = None
+
+async def _snapshot_sessions_periodically():
+    changes = session_manager.store.changes
+    while True:
+        await asyncio.sleep(SESSION_SNAPSHOT_INTERVAL_SECONDS)
+        # Skip the write when no session changed since the last snapshot
+        if session_manager.store.changes == changes:
+            continue
+        changes = session_manager.store.changes
+        try:
+            await run_in_threadpool(session_manager.store.save_snapshot, SESSION_SNAPSHOT_PATH)
+        except OSError as e:
+            print(f"❌ Could not snapshot sessions: {e}")
+
+@app.on_event("startup")
+async def restore_sessions():
+    """Resume the games of the last snapshot and keep snapshotting them"""
+    global _snapshot_task
+    if not SNAPSHOT_SESSIONS:
+        if SESSION_SNAPSHOT_PATH and isinstance(session_manager.store, MemorySessionStore):
+            print("⚠️  Session snapshots are off with more than one worker; set SESSION_STORE to keep games across restarts")
+        return
+    try:
+        restored = session_manager.store.load_snapshot(SESSION_SNAPSHOT_PATH)
+        if restored:
+            print(f"✅ Restored {restored} sessions from {SESSION_SNAPSHOT_PATH}")
+    except (OSError, ValueError, struct.error) as e:
+        print(f"❌ Could not restore sessions: {e}")
+    if SESSION_SNAPSHOT_INTERVAL_SECONDS > 0:
+        _snapshot_task = asyncio.create_task(_snapshot_sessions_periodically())
+
+@app.on_event("shutdown")
+async def snapshot_sessions():
+    """Snapshot every session, so games survive a restart or reload"""
+    if _snapshot_task is not None:
+        _snapshot_task.cancel()
+    if SNAPSHOT_SESSIONS:
+        session_manager.store.save_snapshot(SESSION_SNAPSHOT_PATH)
+
+def require_ready():
+    """Turn game requests away until the warm-up has finished"""
+    if not warmup.ready:
+        detail = f"Warm-up failed: {warmup.error}" if warmup.failed else "Server is warming up, retry shortly."
+        raise HTTPException(status_code=503, detail=detail,
+                            headers={"Retry-After": WARMUP_RETRY_AFTER_SECONDS})
+
+def _cache_lookups() -> List[Tuple[Tuple[str, str], int]]:
+    if not session_manager.has_shared_engine():
+        return []
+    shared_engine = session_manager.shared_engine
+    query_cache = shared_engine.vector_store_manager.query_cache_stats()
+    response_cache = shared_engine.response_cache.stats()
+    pregenerated = shared_engine.pregenerated
+    return [
+        (("query_embedding", "hit"), query_cache["hits"]),
+        (("query_embedding", "miss"), query_cache["misses"]),
+        (("witness_response", "hit"), response_cache["hits"]),
+        (("witness_response", "miss"), response_cache["misses"]),
+        (("pregenerated", "hit"), pregenerated.hits),
+        (("pregenerated", "miss"), pregenerated.misses),
+    ]
+
+CallbackMetric("courtroom_cache_lookups_total", "Cache lookups by cache and result", "counter",
+               ["cache", "result"], _cache_lookups)
+CallbackMetric("courtroom_active_sessions", "Player sessions currently held", "gauge",
+               [], lambda: [((), session_manager.active_sessions())])
+CallbackMetric("courtroom_embedding_model_load_seconds", "Time taken to load the embedding model", "gauge",
+               [], lambda: [((), get_embedding_stats().get("load_seconds"))])
+
+SESSION_HEADER = "X-Session-ID"
+SESSION_COOKIE = "session_id"
+
+def get_session_id(request: Request) -> Optional[str]:
+    """Read the session token from the request header or cookie"""
+    return request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+
+def get_game_engine(request: Request) -> CourtroomGameEngine:
+    """Resolve the game engine of the calling player's session"""
+    require_ready()
+    session_id = get_session_id(request)
+    game_engine = session_manager.get_session(session_id)
+    if game_engine is None:
+        raise HTTPException(status_code=404, detail="Session not found. Start a case first.")
+    request.state.session = (session_id, game_engine)
+    return game_engine
+
+def _attach_session(response: Response, session_id: str):
+    """Send the session token back as a header and cookie"""
+    response.headers[SESSION_HEADER] = session_id
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="lax")
+
+def _select_fields(data: Optional[Dict[str, Any]], fields: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Keep only the comma-separated `fields` of data, when given"""
+    if data is None or not fields:
+        return data
+    wanted = {field.strip() for field in fields.split(",")}
+    return {key: value for key, value in data.items() if key in wanted}
+
+def _game_response(http_request: Request, game_engine: CourtroomGameEngine, message: str,
+                   data: Optional[Dict[str, Any]], points_earned: int = 0):
+    """Build a route's response.
+
+    `?fields=a,b` keeps only those keys of data. `?compact=true` returns a
+    CompactGameResponse instead: data without its embedded game_state, and only
+    the game state fields changed since `?since_version=N`, or the full state if
+    that version is unknown.
+
+    Models are serialized straight to JSON bytes in a FastJSONResponse,
+    skipping FastAPI's response_model validation and jsonable_encoder.
+    """
+    params = http_request.query_params
+    data = _select_fields(data, params.get("fields"))
+    
+    if params.get("compact", "").lower() not in ("1", "true", "yes"):
+        with span("serialize"):
+            return FastJSONResponse(GameResponse(
+                success=True,
+                message=message,
+                data=data,
+                game_state=game_engine.get_game_state(),
+                points_earned=points_earned
+            ))
+    
+    if data is not None:
+        data = {key: value for key, value in data.items() if key != "game_state"}
+    version, state = game_engine.versioned_state()
+    since_version = params.get("since_version")
+    delta = game_engine.state_delta(int(since_version), state) if since_version and since_version.isdigit() else None
+    
+    with span("serialize"):
+        compact = CompactGameResponse(
+            success=True,
+            message=message,
+            data=data,
+            state_version=version,
+            game_state=state if delta is None else None,
+            state_delta=delta,
+            points_earned=points_earned
+        )
+        unset = {field for field in ("data", "game_state", "state_delta") if getattr(compact, field) is None}
+        return FastJSONResponse(compact, exclude=unset)
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {dump_json(data).decode('utf-8')}\n\n"
+
+async def _save_after_stream(body: AsyncIterator, session_id: str, game_engine: CourtroomGameEngine):
+    """Relay a Server-Sent Event stream, then save the session it played"""
+    try:
+        async for chunk in body:
+            yield chunk
+    except Exception:
+        await run_in_threadpool(session_manager.discard_changes, session_id, game_engine)
+        raise
+    try:
+        await run_in_threadpool(session_manager.save_session, session_id, game_engine)
+    except SessionConflictError as e:
+        yield _sse_event("error", {"detail": str(e), "status_code": 409})
+
+def _stream_game_response(events: AsyncIterator[Tuple[str, Any]],
+                          build_response: Callable[[Any], GameResponse]) -> StreamingResponse:
+    """Relay engine tokens as `token` events, then the scored GameResponse as a `result` event"""
+    async def generate():
+        try:
+            async for kind, payload in events:
+                if kind == "token":
+                    yield _sse_event("token", {"content": payload})
+                elif isinstance(payload, dict) and "error" in payload:
+                    yield _sse_event("error", {"detail": payload["error"]})
+                else:
+                    yield _sse_event("result", build_response(payload))
+        except Exception as e:
+            yield _sse_event("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 class StartCaseRequest(BaseModel):
     case_id: Optional[str] = None
@@ -37,6 +306,9 @@ class CallWitnessRequest(BaseModel):
 class QuestionWitnessRequest(BaseModel):
     question: str
 
+class QuestionWitnessBatchRequest(BaseModel):
+    questions: List[str]
+
 class UseEvidenceRequest(BaseModel):
     evidence_id: str
 
@@ -47,186 +319,288 @@ class JudgeChatRequest(BaseModel):
     statement: str
 
 @app.post("/start_case", response_model=GameResponse)
-async def start_case(request: StartCaseRequest):
+async def start_case(request: StartCaseRequest, http_request: Request):
     """Start a new case with introduction and objectives"""
+    require_ready()
     try:
-        case_data = game_engine.start_case(request.case_id)
-        return GameResponse(
-            success=True,
-            message="Case started successfully",
-            data=case_data,
-            game_state=game_engine.get_game_state(),
-            points_earned=0
+        session_id, game_engine = await run_in_threadpool(
+            session_manager.get_or_create_session, get_session_id(http_request)
+        )
+        http_request.state.session = (session_id, game_engine)
+        # Building the case index embeds text, keep it off the event loop
+        case_data = await run_in_threadpool(game_engine.start_case, request.case_id)
+        response = _game_response(http_request, game_engine, "Case started successfully", case_data)
+        _attach_session(response, session_id)
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/bootstrap", response_model=GameResponse)
+async def bootstrap(request: StartCaseRequest, http_request: Request):
+    """Start a new case and return everything the UI needs to render it in one response"""
+    require_ready()
+    try:
+        session_id, game_engine = await run_in_threadpool(
+            session_manager.get_or_create_session, get_session_id(http_request)
         )
+        http_request.state.session = (session_id, game_engine)
+        await run_in_threadpool(game_engine.start_case, request.case_id)
+        response = _game_response(http_request, game_engine, "Case started successfully", game_engine.get_bootstrap())
+        _attach_session(response, session_id)
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/call_witness", response_model=GameResponse)
-async def call_witness(request: CallWitnessRequest):
+async def call_witness(request: CallWitnessRequest, http_request: Request, game_engine: CourtroomGameEngine = Depends(get_game_engine)):
     """Call a witness to the stand"""
     try:
-        response = game_engine.call_witness(request.witness_name)
+        response = await game_engine.acall_witness(request.witness_name)
         if "error" in response:
             raise HTTPException(status_code=400, detail=response["error"])
         
-        return GameResponse(
-            success=True,
-            message=f"Witness {request.witness_name} called to the stand",
-            data=response,
-            game_state=game_engine.get_game_state(),
+        return _game_response(
+            http_request, game_engine, f"Witness {request.witness_name} called to the stand", response,
             points_earned=response.get("points_earned", 0)
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/question_witness", response_model=GameResponse)
-async def question_witness(request: QuestionWitnessRequest):
+async def question_witness(request: QuestionWitnessRequest, http_request: Request, game_engine: CourtroomGameEngine = Depends(get_game_engine)):
     """Ask a question to the current witness"""
     try:
-        response = game_engine.question_witness(request.question)
+        response = await game_engine.aquestion_witness(request.question)
         if "error" in response:
             raise HTTPException(status_code=400, detail=response["error"])
         
-        return GameResponse(
+        return _game_response(
+            http_request, game_engine, "Question processed", response,
+            points_earned=response.get("points_earned", 0)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/question_witness/batch", response_model=GameResponse)
+async def question_witness_batch(request: QuestionWitnessBatchRequest, http_request: Request, game_engine: CourtroomGameEngine = Depends(get_game_engine)):
+    """Ask the current witness several questions, answered concurrently and scored in order"""
+    try:
+        results = await game_engine.aquestion_witness_batch(request.questions)
+        # Only validation errors, such as no witness on the stand; failed LLM calls raise
+        if results and all("error" in result for result in results):
+            raise HTTPException(status_code=400, detail=results[0]["error"])
+        
+        return _game_response(
+            http_request, game_engine, "Questions processed", {"results": results},
+            points_earned=sum(result.get("points_earned", 0) for result in results)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/question_witness/stream")
+async def question_witness_stream(request: QuestionWitnessRequest, game_engine: CourtroomGameEngine = Depends(get_game_engine)):
+    """Ask a question to the current witness, streaming the answer as Server-Sent Events"""
+    return _stream_game_response(
+        game_engine.astream_question_witness(request.question),
+        lambda response: GameResponse(
             success=True,
             message="Question processed",
             data=response,
             game_state=game_engine.get_game_state(),
             points_earned=response.get("points_earned", 0)
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    )
 
 @app.post("/use_evidence", response_model=GameResponse)
-async def use_evidence(request: UseEvidenceRequest):
+async def use_evidence(request: UseEvidenceRequest, http_request: Request, game_engine: CourtroomGameEngine = Depends(get_game_engine)):
     """Present evidence to the court"""
     try:
-        response = game_engine.use_evidence(request.evidence_id)
+        response = await game_engine.ause_evidence(request.evidence_id)
         if "error" in response:
             raise HTTPException(status_code=400, detail=response["error"])
         
-        return GameResponse(
-            success=True,
-            message="Evidence presented",
-            data=response,
-            game_state=game_engine.get_game_state(),
+        return _game_response(
+            http_request, game_engine, "Evidence presented", response,
             points_earned=response.get("points_earned", 0)
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/get_clue", response_model=GameResponse)
-async def get_clue(request: GetClueRequest):
+async def get_clue(request: GetClueRequest, http_request: Request, game_engine: CourtroomGameEngine = Depends(get_game_engine)):
     """Get a hint/clue to help the player"""
     try:
         response = game_engine.get_clue()
         if "error" in response:
             raise HTTPException(status_code=400, detail=response["error"])
         
-        return GameResponse(
-            success=True,
-            message="Clue revealed",
-            data=response,
-            game_state=game_engine.get_game_state(),
+        return _game_response(
+            http_request, game_engine, "Clue revealed", response,
             points_earned=response.get("points_earned", 0)
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/judge_chat", response_model=GameResponse)
-async def judge_chat(request: JudgeChatRequest):
+async def judge_chat(request: JudgeChatRequest, http_request: Request, game_engine: CourtroomGameEngine = Depends(get_game_engine)):
     """Chat directly with the judge for legal advice and points"""
     try:
-        response = game_engine.chat_with_judge(request.statement)
+        response = await game_engine.achat_with_judge(request.statement)
         if "error" in response:
             raise HTTPException(status_code=400, detail=response["error"])
         
-        return GameResponse(
+        return _game_response(
+            http_request, game_engine, "Judge responded", response,
+            points_earned=response.get("points_earned", 0)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/judge_chat/stream")
+async def judge_chat_stream(request: JudgeChatRequest, game_engine: CourtroomGameEngine = Depends(get_game_engine)):
+    """Chat with the judge, streaming the reply as Server-Sent Events"""
+    return _stream_game_response(
+        game_engine.astream_chat_with_judge(request.statement),
+        lambda response: GameResponse(
             success=True,
             message="Judge responded",
             data=response,
             game_state=game_engine.get_game_state(),
             points_earned=response.get("points_earned", 0)
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    )
 
 @app.get("/verdict", response_model=GameResponse)
-async def get_verdict():
+async def get_verdict(http_request: Request, game_engine: CourtroomGameEngine = Depends(get_game_engine)):
     """Get the final verdict from the judge"""
     try:
-        verdict = game_engine.get_verdict()
-        return GameResponse(
+        verdict = await game_engine.aget_verdict()
+        return _game_response(
+            http_request, game_engine, "Verdict delivered", verdict.dict(),
+            points_earned=0
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/verdict/stream")
+async def get_verdict_stream(game_engine: CourtroomGameEngine = Depends(get_game_engine)):
+    """Get the final verdict, streaming the judge's reasoning as Server-Sent Events"""
+    return _stream_game_response(
+        game_engine.astream_verdict(),
+        lambda verdict: GameResponse(
             success=True,
             message="Verdict delivered",
             data=verdict.dict(),
             game_state=game_engine.get_game_state(),
             points_earned=0
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    )
 
 @app.get("/game_state", response_model=GameState)
-async def get_game_state():
+async def get_game_state(game_engine: CourtroomGameEngine = Depends(get_game_engine)):
     """Get current game state"""
-    return game_engine.get_game_state()
+    return FastJSONResponse(game_engine.get_game_state())
 
 @app.get("/available_actions")
-async def get_available_actions():
+async def get_available_actions(game_engine: CourtroomGameEngine = Depends(get_game_engine)):
     """Get available actions for the current turn"""
     try:
         actions = game_engine.get_available_actions()
-        return {"actions": actions}
+        return FastJSONResponse({"actions": actions})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/case_summary")
-async def get_case_summary():
+async def get_case_summary(game_engine: CourtroomGameEngine = Depends(get_game_engine)):
     """Get a summary of the current case"""
     try:
         summary = game_engine.get_case_summary()
-        return summary
+        return FastJSONResponse(summary)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/witnesses")
-async def get_witnesses():
+async def get_witnesses(game_engine: CourtroomGameEngine = Depends(get_game_engine)):
     """Get list of available witnesses"""
     try:
-        case_data = game_engine.get_case_summary()
-        if "error" in case_data:
-            raise HTTPException(status_code=400, detail=case_data["error"])
+        if not game_engine.current_case:
+            raise HTTPException(status_code=400, detail="No case loaded")
         
-        return {"witnesses": case_data.get("witnesses", [])}
+        return FastJSONResponse({"witnesses": game_engine.get_witness_names()})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/evidence")
-async def get_evidence():
+async def get_evidence(game_engine: CourtroomGameEngine = Depends(get_game_engine)):
     """Get list of available evidence"""
     try:
-        case_data = game_engine.get_case_summary()
-        if "error" in case_data:
-            raise HTTPException(status_code=400, detail=case_data["error"])
+        if not game_engine.current_case:
+            raise HTTPException(status_code=400, detail="No case loaded")
         
         # Get detailed evidence information
-        current_case = game_engine.current_case
-        if current_case:
-            evidence_list = []
-            for evidence in current_case.evidence:
-                evidence_list.append({
-                    "id": evidence.id,
-                    "name": evidence.name,
-                    "description": evidence.description,
-                    "presented": evidence.presented,
-                    "points_value": evidence.points_value
-                })
-            return {"evidence": evidence_list}
-        
-        return {"evidence": []}
+        return FastJSONResponse({"evidence": game_engine.get_evidence_list()})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.on_event("shutdown")
+async def close_connections():
+    """Close the LLM provider's pooled connections and the session store"""
+    if session_manager.has_shared_engine():
+        await session_manager.shared_engine.llm_provider.aclose()
+    session_manager.store.close()
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the process is up and serving, whether or not the warm-up has finished"""
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: 200 once the warm-up has finished, otherwise 503 with its progress"""
+    report = warmup.report()
+    report["embedding_model"] = get_embedding_stats()
+    if not warmup.ready:
+        return JSONResponse(report, status_code=503, headers={"Retry-After": WARMUP_RETRY_AFTER_SECONDS})
+    return report
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/slowest", include_in_schema=False)
+async def debug_slowest():
+    """Stage timings and stack samples of the slowest profiled requests"""
+    if not PROFILE_SLOWEST:
+        raise HTTPException(status_code=404, detail="Profiling is disabled. Set PROFILE_SLOWEST to enable it.")
+    return {"requests": slowest_requests.snapshot()}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
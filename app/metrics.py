@@ -0,0 +1,185 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Prometheus text exposition of the server's metrics, without a client library.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: List["_Metric"] = []
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def time(self, **labels) -> "_Timer":
+        """Context manager observing the duration of its block"""
+        return _Timer(self, labels)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+        for key, counts in values:
+            for bound, count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            yield f"{self.name}_bucket{labels} {counts[-2]}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {counts[-2]}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {counts[-1]}"
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class CallbackMetric(_Metric):
+    """A gauge or counter whose samples are read from a callback at scrape time.
+
+    The callback returns (label values, value) pairs.
+    """
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Sequence[str],
+                 callback: Callable[[], Iterable[Tuple[Sequence[str], float]]]):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self.callback():
+            if value is not None:
+                yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text format"""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    "courtroom_http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]
+)
+LLM_CALLS = Counter("courtroom_llm_calls_total", "LLM calls by prompt type and outcome", ["prompt_type", "outcome"])
+LLM_CALL_DURATION = Histogram("courtroom_llm_call_duration_seconds", "LLM call latency by prompt type", ["prompt_type"])
+LLM_RETRIES = Counter("courtroom_llm_retries_total", "LLM call retries by prompt type and reason", ["prompt_type", "reason"])
+LLM_TOKENS = Counter("courtroom_llm_tokens_total", "LLM tokens used by prompt type", ["prompt_type", "kind"])
+EMBEDDING_DURATION = Histogram(
+    "courtroom_embedding_duration_seconds", "Time spent embedding texts", ["kind"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+VECTOR_SEARCH_DURATION = Histogram(
+    "courtroom_vector_search_duration_seconds", "FAISS similarity search latency by index", ["index"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request latency"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Label by route template, not raw path, to keep label cardinality bounded
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status["code"]
+            )
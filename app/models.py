@@ -1,7 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any, Union
 from enum import Enum
 from datetime import datetime
+from functools import cached_property
+
+from keyword_matcher import (
+    KeywordMatcher, LEGAL_KEYWORDS, STRATEGIC_PHRASES, STRATEGIC_QUESTION_KEYWORDS
+)
 
 class GamePhase(str, Enum):
     CASE_INTRO = "case_intro"
@@ -26,8 +31,12 @@ class Witness(BaseModel):
     is_hostile: bool = False
     key_information: List[str]  # Important facts this witness knows
     weaknesses: List[str]  # Areas where witness can be challenged
+    cache_responses: bool = True  # Whether answers may be served from the semantic response cache
 
 class Evidence(BaseModel):
+    # Shared by every session; per-session progress lives in the game engine
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     name: str
     description: str
@@ -39,12 +48,17 @@ class Evidence(BaseModel):
     points_value: int  # Points awarded for using this evidence effectively
 
 class Clue(BaseModel):
+    # Shared by every session; per-session progress lives in the game engine
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     description: str
     discovered: bool = False
     relevance_score: float
     category: str  # "timeline", "motive", "opportunity", "alibi"
     points_value: int  # Points awarded for discovering this clue
+    # Words in a witness answer that reveal this clue; never sent to players
+    keywords: List[str] = Field(default_factory=list, exclude=True)
 
 class LegalRule(BaseModel):
     id: str
@@ -90,6 +104,16 @@ class GameResponse(BaseModel):
     game_state: GameState
     points_earned: int = 0
 
+class CompactGameResponse(BaseModel):
+    """Slim GameResponse: the game state is sent as a delta against a version the client holds"""
+    success: bool
+    message: str
+    data: Optional[Dict[str, Any]] = None
+    state_version: int
+    game_state: Optional[Dict[str, Any]] = None  # Full state, when the client's version is unknown
+    state_delta: Optional[Dict[str, Any]] = None  # Fields changed since the client's version
+    points_earned: int = 0
+
 class CaseData(BaseModel):
     case_id: str
     title: str
@@ -102,6 +126,48 @@ class CaseData(BaseModel):
     background: str
     difficulty: str  # "easy", "medium", "hard"
     objective: CaseObjective
+    # Case-specific terms rewarded in legal statements; never sent to players
+    keywords: List[str] = Field(default_factory=list, exclude=True)
+    
+    @cached_property
+    def keyword_matcher(self) -> KeywordMatcher:
+        """Matcher for every clue, legal and case keyword, compiled once per case"""
+        groups = {
+            "question": STRATEGIC_QUESTION_KEYWORDS,
+            "legal": LEGAL_KEYWORDS,
+            "strategic": STRATEGIC_PHRASES,
+            "case": self.keywords
+        }
+        for clue in self.clues:
+            groups[f"clue:{clue.id}"] = clue.keywords
+        return KeywordMatcher(groups)
+    
+    @cached_property
+    def witnesses_by_name(self) -> Dict[str, Witness]:
+        """Witnesses keyed by lower-cased name"""
+        return {witness.name.lower(): witness for witness in self.witnesses}
+    
+    @cached_property
+    def evidence_by_id(self) -> Dict[str, Evidence]:
+        """Evidence keyed by lower-cased id"""
+        return {evidence.id.lower(): evidence for evidence in self.evidence}
+    
+    @cached_property
+    def clues_by_id(self) -> Dict[str, Clue]:
+        """Clues keyed by lower-cased id"""
+        return {clue.id.lower(): clue for clue in self.clues}
+    
+    def get_witness(self, name: str) -> Optional[Witness]:
+        """Find a witness by name, ignoring case"""
+        return self.witnesses_by_name.get(name.lower())
+    
+    def get_evidence(self, evidence_id: str) -> Optional[Evidence]:
+        """Find evidence by id, ignoring case"""
+        return self.evidence_by_id.get(evidence_id.lower())
+    
+    def get_clue(self, clue_id: str) -> Optional[Clue]:
+        """Find a clue by id, ignoring case"""
+        return self.clues_by_id.get(clue_id.lower())
 
 class Verdict(BaseModel):
     guilty: bool
@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Output of warm_response_cache.py, loaded when the server starts
+PREGENERATED_PATH = os.getenv(
+    "PREGENERATED_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pregenerated.json")
+)
+
+logger = logging.getLogger(__name__)
+
+# How long a case whose generation failed waits before it is tried again
+PREGENERATE_RETRY_SECONDS = float(os.getenv("PREGENERATE_RETRY_SECONDS", "60"))
+
+# (kind, key) -> prompt, e.g. ("intro", "alice monroe") or ("evidence", "E1")
+PromptTable = Dict[Tuple[str, str], str]
+
+# Called with (prompt, kind) and returns the generated text
+Generator = Callable[[str, str], str]
+
+
+class PregeneratedResponses:
+    """LLM outputs that only depend on static case data, generated once per case.
+
+    Cases are scheduled when first loaded and their prompts run on a small
+    background pool. Lookups return None until an entry is ready, so callers
+    fall back to a live call. Entries generated in the background are saved
+    to ``path`` once their case is done, so later starts load them instead
+    of calling the LLM again. A case with failed entries can be scheduled
+    again after PREGENERATE_RETRY_SECONDS.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, path: Optional[str] = None):
+        self.max_workers = max_workers or int(os.getenv("PREGENERATE_WORKERS", "2"))
+        self.path = PREGENERATED_PATH if path is None else path
+        self.hits = 0
+        self.misses = 0
+        self._responses: Dict[Tuple[str, str, str], str] = {}
+        self._scheduled_cases = set()
+        # case_id -> [entries left to generate, entries generated, entries failed]
+        self._batches: Dict[str, List[int]] = {}
+        # case_id -> monotonic time after which a failed case may be scheduled again
+        self._retry_at: Dict[str, float] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def get(self, case_id: str, kind: str, key: str) -> Optional[str]:
+        response = self._responses.get((case_id, kind, key))
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    def is_scheduled(self, case_id: str) -> bool:
+        """Whether the case is generated or being generated, or failed too recently to try again"""
+        return case_id in self._scheduled_cases or time.monotonic() < self._retry_at.get(case_id, 0.0)
+
+    def schedule_case(self, case_id: str, prompts: PromptTable, generate: Generator):
+        """Generate a case's missing entries in the background"""
+        missing = {
+            (kind, key): prompt for (kind, key), prompt in prompts.items()
+            if (case_id, kind, key) not in self._responses
+        }
+        with self._lock:
+            if self.is_scheduled(case_id):
+                return
+            self._scheduled_cases.add(case_id)
+            if not missing:
+                return
+            self._batches[case_id] = [len(missing), 0, 0]
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="pregenerate"
+                )
+            executor = self._executor
+
+        for (kind, key), prompt in missing.items():
+            executor.submit(self._generate_scheduled_entry, case_id, kind, key, prompt, generate)
+
+    def generate_case(self, case_id: str, prompts: PromptTable, generate: Generator):
+        """Generate a case's missing entries now, e.g. at build time"""
+        self._scheduled_cases.add(case_id)
+        for (kind, key), prompt in prompts.items():
+            if (case_id, kind, key) not in self._responses:
+                self._generate_entry(case_id, kind, key, prompt, generate)
+
+    def _generate_entry(self, case_id: str, kind: str, key: str, prompt: str,
+                        generate: Generator) -> bool:
+        try:
+            self._responses[(case_id, kind, key)] = generate(prompt, kind)
+            return True
+        except Exception as e:
+            # Left missing, the endpoint falls back to a live call
+            logger.warning("Pre-generating %s %s of case %s failed: %s", kind, key, case_id, e)
+            return False
+
+    def _generate_scheduled_entry(self, case_id: str, kind: str, key: str, prompt: str,
+                                  generate: Generator):
+        generated = self._generate_entry(case_id, kind, key, prompt, generate)
+        with self._lock:
+            batch = self._batches[case_id]
+            batch[0] -= 1
+            batch[1 if generated else 2] += 1
+            if batch[0]:
+                return
+            del self._batches[case_id]
+            if batch[2]:
+                # Let a later start of the case retry the failed entries
+                self._scheduled_cases.discard(case_id)
+                self._retry_at[case_id] = time.monotonic() + PREGENERATE_RETRY_SECONDS
+        if batch[1] and self.path:
+            try:
+                self.save(self.path)
+            except (OSError, ValueError) as e:
+                logger.warning("Could not save pre-generated responses to %s: %s", self.path, e)
+
+    def save(self, path: Optional[str] = None):
+        """Write every entry to a JSON file, keeping entries other processes saved there"""
+        path = self.path if path is None else path
+        with self._save_lock:
+            responses = dict(self._read(path))
+            responses.update(self._responses)
+            records = [
+                {"case_id": case_id, "kind": kind, "key": key, "response": response}
+                for (case_id, kind, key), response in responses.items()
+            ]
+            # Unique per process, as several workers may save at once
+            tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"responses": records}, f)
+            os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read(path: str) -> Dict[Tuple[str, str, str], str]:
+        if not path or not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f).get("responses", [])
+        return {(record["case_id"], record["kind"], record["key"]): record["response"] for record in records}
+
+    def load(self, path: Optional[str] = None) -> int:
+        responses = self._read(self.path if path is None else path)
+        self._responses.update(responses)
+        return len(responses)
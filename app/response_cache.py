@@ -0,0 +1,178 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+# Warm-up output of warm_response_cache.py, loaded when the server starts
+RESPONSE_CACHE_PATH = os.getenv(
+    "RESPONSE_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".response_cache.json")
+)
+
+_TOKEN = re.compile(r"\w+(?:[:.']\w+)*")
+_NUMBER_WORDS = frozenset(
+    "one two three four five six seven eight nine ten eleven twelve thirteen fourteen fifteen sixteen "
+    "seventeen eighteen nineteen twenty thirty forty fifty sixty hundred thousand half quarter "
+    "noon midnight am pm a.m p.m".split()
+)
+
+
+def question_specifics(question: str) -> FrozenSet[str]:
+    """Numbers, times and names in a question, which its embedding barely tells apart.
+
+    "Were you there at 9pm?" and "Were you there at 11pm?" embed almost
+    identically, so a cached answer is only reused when these match too.
+    Names are capitalized words other than the first of a sentence.
+    """
+    specifics = set()
+    for match in _TOKEN.finditer(question):
+        token = match.group()
+        lowered = token.lower()
+        sentence_start = question[:match.start()].rstrip()[-1:] in ("", ".", "?", "!")
+        if (any(char.isdigit() for char in token) or lowered in _NUMBER_WORDS
+                or (token[0].isupper() and not sentence_start and token != "I")):
+            specifics.add(lowered)
+    return frozenset(specifics)
+
+
+class _WitnessEntries:
+    """Cached answers for one witness, with their question vectors stacked for a single dot product"""
+
+    def __init__(self):
+        self.questions: List[str] = []
+        self.specifics: List[FrozenSet[str]] = []
+        self.answers: List[str] = []
+        self.vectors: List[np.ndarray] = []
+        self.created: List[float] = []
+        self.pinned: List[bool] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    def matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix = np.vstack(self.vectors)
+        return self._matrix
+
+    def append(self, question: str, answer: str, vector: np.ndarray, created: float, pinned: bool):
+        self.questions.append(question)
+        self.specifics.append(question_specifics(question))
+        self.answers.append(answer)
+        self.vectors.append(vector)
+        self.created.append(created)
+        self.pinned.append(pinned)
+        self._matrix = None
+
+    def remove(self, index: int):
+        for values in (self.questions, self.specifics, self.answers, self.vectors, self.created, self.pinned):
+            del values[index]
+        self._matrix = None
+
+
+class SemanticResponseCache:
+    """Witness answers keyed by (case_id, witness, question embedding).
+
+    A new question is served a stored answer when its embedding's cosine
+    similarity to a cached question is at least ``threshold`` and both name
+    the same numbers, times and names (see question_specifics). Entries expire
+    after ``ttl_seconds`` and each witness keeps at most ``max_entries``,
+    dropping the oldest first. Pinned entries, produced by the offline warm-up,
+    never expire and are only dropped when a witness holds nothing else.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, ttl_seconds: Optional[int] = None,
+                 max_entries: Optional[int] = None):
+        self.threshold = threshold or float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.92"))
+        self.ttl_seconds = ttl_seconds or int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+        self.max_entries = max_entries or int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple[str, str], _WitnessEntries] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, case_id: str, witness_name: str, question: str, vector) -> Optional[str]:
+        """Return the cached answer to the most similar question, if it is similar enough and asks about the same specifics"""
+        key = (case_id, witness_name.lower())
+        query = self._normalize(vector)
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries is not None:
+                self._expire(entries)
+            if not entries or not entries.vectors:
+                self.misses += 1
+                return None
+
+            similarities = entries.matrix() @ query
+            specifics = question_specifics(question)
+            for index in np.argsort(-similarities):
+                if similarities[index] < self.threshold:
+                    break
+                if entries.specifics[index] == specifics:
+                    self.hits += 1
+                    return entries.answers[index]
+
+            self.misses += 1
+            return None
+
+    def store(self, case_id: str, witness_name: str, question: str, vector, answer: str, pinned: bool = False):
+        """Cache an answer, evicting the oldest entries over capacity"""
+        key = (case_id, witness_name.lower())
+        with self._lock:
+            entries = self._entries.setdefault(key, _WitnessEntries())
+            entries.append(question, answer, self._normalize(vector), time.time(), pinned)
+            while len(entries.answers) > self.max_entries:
+                unpinned = [i for i, is_pinned in enumerate(entries.pinned) if not is_pinned]
+                entries.remove(unpinned[0] if unpinned else 0)
+
+    def _expire(self, entries: _WitnessEntries):
+        """Drop expired entries. Must be called with the lock held."""
+        cutoff = time.time() - self.ttl_seconds
+        for index in reversed(range(len(entries.answers))):
+            if not entries.pinned[index] and entries.created[index] < cutoff:
+                entries.remove(index)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": sum(len(entries.answers) for entries in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def save(self, path: str = RESPONSE_CACHE_PATH):
+        """Write pinned entries to a JSON file"""
+        records = []
+        with self._lock:
+            for (case_id, witness_key), entries in self._entries.items():
+                for index, pinned in enumerate(entries.pinned):
+                    if pinned:
+                        records.append({
+                            "case_id": case_id,
+                            "witness": witness_key,
+                            "question": entries.questions[index],
+                            "answer": entries.answers[index],
+                            "vector": entries.vectors[index].tolist()
+                        })
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": records}, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str = RESPONSE_CACHE_PATH) -> int:
+        """Load pinned entries written by save, returning how many were loaded"""
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f).get("entries", [])
+        for record in records:
+            self.store(record["case_id"], record["witness"], record["question"],
+                       record["vector"], record["answer"], pinned=True)
+        return len(records)
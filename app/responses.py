@@ -0,0 +1,38 @@
+from typing import Any, Optional, Set
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    """Encode the values orjson does not handle natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dump_json(content: Any, exclude: Optional[Set[str]] = None) -> bytes:
+    """Serialize a Pydantic model with its Rust serializer, or anything else with orjson"""
+    if isinstance(content, BaseModel):
+        # Straight to bytes, skipping model_dump_json's round trip through str
+        return content.__pydantic_serializer__.to_json(content, exclude=exclude)
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by dump_json.
+
+    Routes return it directly, so FastAPI neither re-validates the content
+    against the route's response_model nor runs it through jsonable_encoder.
+    ``exclude`` drops top-level fields of a model.
+    """
+
+    def __init__(self, content: Any, exclude: Optional[Set[str]] = None, **kwargs):
+        self.exclude = exclude
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content, self.exclude)
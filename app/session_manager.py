@@ -0,0 +1,151 @@
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from game_engine import CourtroomGameEngine
+from session_store import SessionConflictError, SessionStore, create_session_store, decode_session, encode_session
+from tracing import span
+
+
+class SessionManager:
+    """Holds one CourtroomGameEngine per player session.
+
+    Every session engine shares the LLM client and vector stores of a single
+    shared engine, so a new session only costs its own game state. The shared
+    engine is built on first use, normally by the server's startup warm-up,
+    since it loads the embedding model and vector indexes. Sessions are
+    kept in least-recently-used order and evicted when idle for longer than
+    ``ttl_seconds`` or when more than ``max_sessions`` are active.
+
+    Game progress is saved to a SessionStore after each request and loaded
+    from it when another worker saved it since, so with a SQLite or Redis
+    store any worker can serve any player. Engines held here are a cache of
+    the store, reused while their version is current.
+    """
+
+    def __init__(self, shared_engine: Optional[CourtroomGameEngine] = None,
+                 max_sessions: Optional[int] = None, ttl_seconds: Optional[int] = None,
+                 store: Optional[SessionStore] = None):
+        self._shared_engine = shared_engine
+        self._shared_engine_lock = threading.Lock()
+        self.max_sessions = max_sessions or int(os.getenv("MAX_SESSIONS", "1000"))
+        self.ttl_seconds = ttl_seconds or int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+        self.store = store or create_session_store(self.ttl_seconds, self.max_sessions)
+        # session_id -> (engine, last access time), least recently used first
+        self._sessions: "OrderedDict[str, Tuple[CourtroomGameEngine, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def shared_engine(self) -> CourtroomGameEngine:
+        if self._shared_engine is None:
+            with self._shared_engine_lock:
+                if self._shared_engine is None:
+                    self._shared_engine = CourtroomGameEngine()
+        return self._shared_engine
+
+    def has_shared_engine(self) -> bool:
+        """Whether the shared engine has been built"""
+        return self._shared_engine is not None
+
+    def create_session(self) -> Tuple[str, CourtroomGameEngine]:
+        """Create a new session and return its id and engine"""
+        session_id = secrets.token_urlsafe(16)
+        engine = self.shared_engine.new_session()
+        with self._lock:
+            self._sessions[session_id] = (engine, time.monotonic())
+            self._evict()
+        return session_id, engine
+
+    def get_session(self, session_id: Optional[str]) -> Optional[CourtroomGameEngine]:
+        """Get the engine for a session, loading it from the store if it changed since it was cached"""
+        if not session_id:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+        cached = entry[0] if entry is not None and now - entry[1] <= self.ttl_seconds else None
+
+        with span("session_load"):
+            loaded = self.store.load(session_id, cached.session_version if cached else None)
+            if loaded is None:
+                with self._lock:
+                    self._sessions.pop(session_id, None)
+                return None
+            version, payload = loaded
+            engine = cached
+            if payload is not None:
+                engine = self.shared_engine.new_session()
+                engine.restore_session(decode_session(payload))
+                engine.session_version, engine.session_payload = version, payload
+
+        with self._lock:
+            self._sessions[session_id] = (engine, now)
+            self._sessions.move_to_end(session_id)
+            self._evict()
+        return engine
+
+    def save_session(self, session_id: str, engine: CourtroomGameEngine) -> bool:
+        """Save the session's progress to the store if it changed, returning whether it was written.
+
+        Raises SessionConflictError if another request saved the session since it was loaded.
+        """
+        with span("session_save"):
+            payload = encode_session(engine.export_session())
+            if payload == engine.session_payload:
+                return False
+            try:
+                version = self.store.save(session_id, payload, engine.session_version)
+            except SessionConflictError:
+                # Drop the stale engine, so the next request loads the saved progress
+                self._uncache(session_id, engine)
+                raise
+            engine.session_version, engine.session_payload = version, payload
+        return True
+
+    def discard_changes(self, session_id: str, engine: CourtroomGameEngine):
+        """Drop the cached engine if it changed since it was saved, as when a request failed part-way.
+
+        The next request then loads the session as last saved, or finds it
+        missing if it never was.
+        """
+        if encode_session(engine.export_session()) != engine.session_payload:
+            self._uncache(session_id, engine)
+
+    def _uncache(self, session_id: str, engine: CourtroomGameEngine):
+        with self._lock:
+            if self._sessions.get(session_id, (None,))[0] is engine:
+                del self._sessions[session_id]
+
+    def get_or_create_session(self, session_id: Optional[str]) -> Tuple[str, CourtroomGameEngine]:
+        """Get an existing session or create a new one if it is missing or expired"""
+        engine = self.get_session(session_id)
+        if engine is not None:
+            return session_id, engine
+        return self.create_session()
+
+    def end_session(self, session_id: str):
+        """Drop a session"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        self.store.delete(session_id)
+
+    def active_sessions(self) -> int:
+        """Number of sessions currently held by this worker"""
+        with self._lock:
+            self._evict()
+            return len(self._sessions)
+
+    def _evict(self):
+        """Evict expired sessions, then the least recently used ones over capacity.
+
+        Must be called with the lock held.
+        """
+        now = time.monotonic()
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if now - last_access <= self.ttl_seconds and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[session_id]
@@ -0,0 +1,394 @@
+import os
+import socket
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+import orjson
+
+SESSION_COMPRESSION_LEVEL = int(os.getenv("SESSION_COMPRESSION_LEVEL", "6"))
+SESSION_SNAPSHOT_PATH = os.getenv(
+    "SESSION_SNAPSHOT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".session_snapshot")
+)
+# How often stores without native expiry drop expired sessions
+PURGE_INTERVAL_SECONDS = 60
+
+# Snapshot file: magic and session count, then per session its id length,
+# version, expiry as a Unix time and payload length, followed by the id and payload
+SNAPSHOT_MAGIC = b"CRTSNAP1"
+_SNAPSHOT_HEADER = struct.Struct("<8sI")
+_SNAPSHOT_RECORD = struct.Struct("<HQdI")
+
+
+class SessionConflictError(Exception):
+    """The session was saved by another request since this one loaded it"""
+
+
+def encode_session(data: Dict[str, Any]) -> bytes:
+    """Serialize session state to compressed JSON"""
+    return zlib.compress(orjson.dumps(data), SESSION_COMPRESSION_LEVEL)
+
+
+def decode_session(payload: bytes) -> Dict[str, Any]:
+    return orjson.loads(zlib.decompress(payload))
+
+
+class SessionStore:
+    """Keeps serialized session state, shared by every worker using the same store.
+
+    Sessions carry a version that each save increments. A save passes the
+    version its state was loaded at (0 for a new session) and fails with
+    SessionConflictError if the session was saved since, so concurrent
+    requests for one session cannot overwrite each other's progress.
+    Sessions expire ``ttl_seconds`` after their last save.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        # Bumped by every change a snapshot would capture
+        self.changes = 0
+
+    def load(self, session_id: str, known_version: Optional[int] = None) -> Optional[Tuple[int, Optional[bytes]]]:
+        """The session's version and payload, or None if it is missing or expired.
+
+        The payload is None when the version equals ``known_version``, as the caller already holds it.
+        """
+        raise NotImplementedError
+
+    def save(self, session_id: str, payload: bytes, expected_version: int) -> int:
+        """Store a new payload for the session and return its new version"""
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+    def save_snapshot(self, path: str = SESSION_SNAPSHOT_PATH) -> int:
+        """Write every session to a file, returning how many were written.
+
+        Stores that persist sessions themselves have nothing to snapshot.
+        """
+        return 0
+
+    def load_snapshot(self, path: str = SESSION_SNAPSHOT_PATH) -> int:
+        """Add the sessions of a file written by save_snapshot, returning how many were loaded"""
+        return 0
+
+    def close(self):
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions in this process only, for a single worker. At most ``max_sessions`` are kept."""
+
+    def __init__(self, ttl_seconds: int, max_sessions: int):
+        super().__init__(ttl_seconds)
+        self.max_sessions = max_sessions
+        # session_id -> (version, payload, expiry time), least recently saved first
+        self._sessions: "OrderedDict[str, Tuple[int, bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str, known_version: Optional[int] = None) -> Optional[Tuple[int, Optional[bytes]]]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+        if entry is None or entry[2] < time.monotonic():
+            return None
+        version, payload, _ = entry
+        return version, None if version == known_version else payload
+
+    def save(self, session_id: str, payload: bytes, expected_version: int) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            current_version = entry[0] if entry is not None and entry[2] >= now else 0
+            if current_version != expected_version:
+                raise SessionConflictError(f"Session {session_id} is at version {current_version}, not {expected_version}")
+            self._sessions[session_id] = (expected_version + 1, payload, now + self.ttl_seconds)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            self.changes += 1
+        return expected_version + 1
+
+    def delete(self, session_id: str):
+        with self._lock:
+            if self._sessions.pop(session_id, None) is not None:
+                self.changes += 1
+
+    def save_snapshot(self, path: str = SESSION_SNAPSHOT_PATH) -> int:
+        """Write unexpired sessions to a file, replacing it atomically.
+
+        Payloads are written as stored, already compressed, so taking a
+        snapshot costs little more than copying them.
+        """
+        now = time.monotonic()
+        # Expiry is stored as a Unix time, since monotonic time restarts with the process
+        to_unix = time.time() - now
+        with self._lock:
+            sessions = [(session_id, entry) for session_id, entry in self._sessions.items() if entry[2] > now]
+
+        parts = [_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(sessions))]
+        for session_id, (version, payload, expires_at) in sessions:
+            session_key = session_id.encode("utf-8")
+            parts.append(_SNAPSHOT_RECORD.pack(len(session_key), version, expires_at + to_unix, len(payload)))
+            parts.append(session_key)
+            parts.append(payload)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Unique per writer, as the shutdown snapshot can overlap a periodic one
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(parts))
+        os.replace(tmp_path, path)
+        return len(sessions)
+
+    def load_snapshot(self, path: str = SESSION_SNAPSHOT_PATH) -> int:
+        """Add the unexpired sessions of a snapshot, keeping any saved here since.
+
+        Only the compressed payloads are loaded; each game is decoded when its
+        player's next request arrives.
+        """
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, count = _SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a session snapshot")
+
+        to_monotonic = time.monotonic() - time.time()
+        now = time.time()
+        offset = _SNAPSHOT_HEADER.size
+        loaded = []
+        for _ in range(count):
+            key_length, version, expires_at, payload_length = _SNAPSHOT_RECORD.unpack_from(data, offset)
+            offset += _SNAPSHOT_RECORD.size
+            session_id = data[offset:offset + key_length].decode("utf-8")
+            offset += key_length
+            payload = data[offset:offset + payload_length]
+            offset += payload_length
+            if expires_at > now:
+                loaded.append((session_id, (version, payload, expires_at + to_monotonic)))
+
+        with self._lock:
+            for session_id, entry in loaded:
+                self._sessions.setdefault(session_id, entry)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return len(loaded)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a SQLite database file, shared by the workers of one machine"""
+
+    def __init__(self, path: str, ttl_seconds: int):
+        super().__init__(ttl_seconds)
+        self.path = path
+        # A connection per thread, as sqlite3 connections cannot be shared between threads
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, version INTEGER NOT NULL, payload BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit, so each statement is its own transaction
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def load(self, session_id: str, known_version: Optional[int] = None) -> Optional[Tuple[int, Optional[bytes]]]:
+        row = self._connection().execute(
+            "SELECT version, CASE WHEN version = ? THEN NULL ELSE payload END FROM sessions "
+            "WHERE session_id = ? AND expires_at > ?",
+            (known_version, session_id, time.time())
+        ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def save(self, session_id: str, payload: bytes, expected_version: int) -> int:
+        connection = self._connection()
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        if expected_version == 0:
+            # A new session, or one whose id is only held by an expired row
+            cursor = connection.execute(
+                "INSERT INTO sessions VALUES (?, 1, ?, ?) ON CONFLICT(session_id) DO UPDATE "
+                "SET version = 1, payload = excluded.payload, expires_at = excluded.expires_at "
+                "WHERE sessions.expires_at <= ?",
+                (session_id, payload, expires_at, now)
+            )
+        else:
+            cursor = connection.execute(
+                "UPDATE sessions SET version = version + 1, payload = ?, expires_at = ? "
+                "WHERE session_id = ? AND version = ? AND expires_at > ?",
+                (payload, expires_at, session_id, expected_version, now)
+            )
+        if cursor.rowcount == 0:
+            raise SessionConflictError(f"Session {session_id} is no longer at version {expected_version}")
+
+        if now - self._last_purge > PURGE_INTERVAL_SECONDS:
+            self._last_purge = now
+            connection.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        return expected_version + 1
+
+    def delete(self, session_id: str):
+        self._connection().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class RESPError(Exception):
+    """An error reply from a Redis-protocol server"""
+
+
+class RESPConnection:
+    """A minimal blocking client for the Redis serialization protocol (RESP2)"""
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0):
+        self._socket = socket.create_connection((host, port), timeout=timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._socket.makefile("rb")
+
+    def command(self, *args) -> Any:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        self._socket.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by the session store")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode("utf-8")
+        if kind == b"-":
+            raise RESPError(rest.decode("utf-8"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RESPError(f"Unexpected reply {line!r}")
+
+    def close(self):
+        self._reader.close()
+        self._socket.close()
+
+
+class RedisSessionStore(SessionStore):
+    """Sessions in Redis, or any server speaking its protocol, shared by workers on any machine.
+
+    Each session is one key holding an 8-byte version followed by the payload.
+    Saves check the version inside WATCH/MULTI/EXEC and set the key with an
+    expiry of ``ttl_seconds``.
+    """
+
+    KEY_PREFIX = "courtroom:session:"
+
+    def __init__(self, url: str, ttl_seconds: int):
+        super().__init__(ttl_seconds)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        # A connection per thread, as WATCH applies to the connection
+        self._local = threading.local()
+
+    def _connection(self) -> RESPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = RESPConnection(self.host, self.port)
+            if self.password:
+                connection.command("AUTH", self.password)
+            if self.db:
+                connection.command("SELECT", self.db)
+            self._local.connection = connection
+        return connection
+
+    def _command(self, *commands: Tuple) -> List[Any]:
+        """Run commands on this thread's connection, reconnecting next time if it fails"""
+        connection = self._connection()
+        try:
+            return [connection.command(*command) for command in commands]
+        except (OSError, ConnectionError):
+            connection.close()
+            self._local.connection = None
+            raise
+
+    @staticmethod
+    def _split(value: Optional[bytes]) -> Tuple[int, Optional[bytes]]:
+        if value is None:
+            return 0, None
+        return int.from_bytes(value[:8], "big"), value[8:]
+
+    def load(self, session_id: str, known_version: Optional[int] = None) -> Optional[Tuple[int, Optional[bytes]]]:
+        value = self._command(("GET", self.KEY_PREFIX + session_id))[0]
+        if value is None:
+            return None
+        version, payload = self._split(value)
+        return version, None if version == known_version else payload
+
+    def save(self, session_id: str, payload: bytes, expected_version: int) -> int:
+        key = self.KEY_PREFIX + session_id
+        current_version, _ = self._split(self._command(("WATCH", key), ("GET", key))[1])
+        if current_version != expected_version:
+            self._command(("UNWATCH",))
+            raise SessionConflictError(f"Session {session_id} is at version {current_version}, not {expected_version}")
+
+        version = expected_version + 1
+        value = version.to_bytes(8, "big") + payload
+        # EXEC returns nil when the key changed after WATCH
+        result = self._command(("MULTI",), ("SET", key, value, "EX", self.ttl_seconds), ("EXEC",))[-1]
+        if result is None:
+            raise SessionConflictError(f"Session {session_id} was saved concurrently")
+        return version
+
+    def delete(self, session_id: str):
+        self._command(("DEL", self.KEY_PREFIX + session_id))
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def create_session_store(ttl_seconds: int, max_sessions: int) -> SessionStore:
+    """The store selected by SESSION_STORE: "memory" (default), "sqlite:///path/to/sessions.db" or "redis://host:port/db" """
+    url = os.getenv("SESSION_STORE", "memory")
+    if url.startswith("sqlite:"):
+        path = url[len("sqlite:"):]
+        if path.startswith("///"):
+            path = path[3:]
+        return SQLiteSessionStore(path or "sessions.db", ttl_seconds)
+    if url.startswith("redis:"):
+        return RedisSessionStore(url, ttl_seconds)
+    if url != "memory":
+        raise ValueError(f"Unknown SESSION_STORE {url!r}")
+    return MemorySessionStore(ttl_seconds, max_sessions)
@@ -0,0 +1,269 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Trace every request, not only those sent with the X-Debug-Trace: 1 header
+TRACE_ALL_REQUESTS = os.getenv("TRACE_REQUESTS", "0") == "1"
+TRACE_HEADER = b"x-debug-trace"
+# Traced requests are written here as Chrome trace files. Empty disables it.
+TRACE_DIR = os.getenv("TRACE_DIR", "")
+# Number of slowest requests to keep stack samples for. 0 disables the profiler.
+PROFILE_SLOWEST = int(os.getenv("PROFILE_SLOWEST", "0"))
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+
+
+class Trace:
+    """Stage timings of one request, plus stack samples when profiled.
+
+    The trace is carried in a context variable, so spans opened in tasks and
+    worker threads started by the request (asyncio.gather, asyncio.to_thread)
+    are recorded on it too.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = secrets.token_hex(8)
+        self.started_at = time.time()
+        self.duration: Optional[float] = None
+        # (stage, start offset, duration, thread id)
+        self.spans: List[Tuple[str, float, float, int]] = []
+        self.threads: Set[int] = {threading.get_ident()}
+        # Collapsed stack ("outer;inner") -> number of samples
+        self.stacks: Counter = Counter()
+        self._origin = time.perf_counter()
+
+    def add_span(self, name: str, started: float, ended: float):
+        thread_id = threading.get_ident()
+        self.threads.add(thread_id)
+        self.spans.append((name, started - self._origin, ended - started, thread_id))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._origin
+
+    def finish(self):
+        self.duration = self.elapsed()
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Seconds spent in each stage, in the order stages first ran"""
+        totals: Dict[str, float] = {}
+        for name, _, duration, _ in list(self.spans):
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+    def server_timing(self) -> str:
+        """Stage timings as a Server-Timing header value"""
+        metrics = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stage_totals().items()]
+        metrics.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(metrics)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """The trace in Chrome's trace event format, for chrome://tracing or Perfetto"""
+        pid = os.getpid()
+        events = [{
+            "name": self.name, "ph": "X", "ts": 0, "dur": round((self.duration or self.elapsed()) * 1e6),
+            "pid": pid, "tid": "request"
+        }]
+        for name, offset, duration, thread_id in list(self.spans):
+            events.append({
+                "name": name, "ph": "X", "ts": round(offset * 1e6), "dur": round(duration * 1e6),
+                "pid": pid, "tid": thread_id
+            })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": self.trace_id, "request": self.name, "started_at": self.started_at}
+        }
+
+    def save(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"trace-{int(self.started_at * 1000)}-{self.trace_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+    def summary(self, top_stacks: int = 20) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "request": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round((self.duration or self.elapsed()) * 1000, 2),
+            "stages_ms": {name: round(seconds * 1000, 2) for name, seconds in self.stage_totals().items()},
+            "samples": sum(self.stacks.values()),
+            "top_stacks": [{"stack": stack, "samples": count} for stack, count in self.stacks.most_common(top_stacks)]
+        }
+
+
+class span:
+    """Time a block as a stage of the current request's trace; a no-op when it is not traced"""
+
+    __slots__ = ("name", "trace", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.trace = _current_trace.get()
+        if self.trace is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self.trace is not None:
+            self.trace.add_span(self.name, self.started, time.perf_counter())
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+class StackSampler:
+    """Samples the Python stacks of threads serving profiled requests.
+
+    A daemon thread wakes every ``interval`` seconds while any request is being
+    profiled and adds the collapsed stack of each thread the request has run on.
+    Requests share the event loop thread, so under concurrent load a request's
+    samples include work done for other requests at the same time.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._traces: Set[Trace] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, trace: Trace):
+        with self._lock:
+            self._traces.add(trace)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, trace: Trace):
+        with self._lock:
+            self._traces.discard(trace)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            with self._lock:
+                traces = list(self._traces)
+            if not traces:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            frames = sys._current_frames()
+            collapsed: Dict[int, str] = {}
+            for trace in traces:
+                for thread_id in list(trace.threads):
+                    if thread_id == own_id or thread_id not in frames:
+                        continue
+                    if thread_id not in collapsed:
+                        collapsed[thread_id] = self._collapse(frames[thread_id])
+                    trace.stacks[collapsed[thread_id]] += 1
+            del frames
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+class SlowestRequests:
+    """Keeps the ``size`` slowest profiled requests"""
+
+    def __init__(self, size: int = PROFILE_SLOWEST):
+        self.size = size
+        self._heap: List[Tuple[float, int, Trace]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def offer(self, trace: Trace) -> bool:
+        """Keep the trace if it is among the slowest so far"""
+        entry = (trace.duration, next(self._counter), trace)
+        with self._lock:
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, entry)
+                return True
+            if self._heap and trace.duration > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+                return True
+        return False
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            traces = [trace for _, _, trace in sorted(self._heap, reverse=True)]
+        return [trace.summary() for trace in traces]
+
+
+stack_sampler = StackSampler()
+slowest_requests = SlowestRequests()
+
+
+class TracingMiddleware:
+    """ASGI middleware tracing requests by stage.
+
+    A request is traced when TRACE_REQUESTS=1 or it carries X-Debug-Trace: 1; its
+    stage timings are returned in a Server-Timing header and, with TRACE_DIR set,
+    written out as a Chrome trace file. With PROFILE_SLOWEST set, every request
+    is also stack-sampled and the slowest ones are kept for /debug/slowest.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = TRACE_ALL_REQUESTS or dict(scope["headers"]).get(TRACE_HEADER, b"") in (b"1", b"true")
+        profiled = PROFILE_SLOWEST > 0
+        if not (requested or profiled):
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(f"{scope['method']} {scope['path']}")
+        token = _current_trace.set(trace)
+        if profiled:
+            stack_sampler.start(trace)
+
+        async def send_with_timing(message):
+            if requested and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                headers.append((b"x-trace-id", trace.trace_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            trace.finish()
+            route = scope.get("route")
+            if route is not None:
+                trace.name = f"{scope['method']} {route.path}"
+            if profiled:
+                stack_sampler.stop(trace)
+                slowest_requests.offer(trace)
+            if requested and TRACE_DIR:
+                await asyncio.to_thread(trace.save, TRACE_DIR)
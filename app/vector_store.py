@@ -1,28 +1,212 @@
 import os
-from typing import List
-from langchain.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
+import hashlib
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from embeddings import get_embeddings
+from metrics import EMBEDDING_DURATION, VECTOR_SEARCH_DURATION
+
+# Built indexes are saved here, keyed by corpus content and embedding model. Empty disables it.
+VECTOR_CACHE_DIR = os.getenv(
+    "VECTOR_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".vector_cache")
+)
+
+def normalize_query(query: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation so near-identical questions share a key"""
+    return " ".join(query.lower().split()).rstrip("?!. ")
 
 class VectorStoreManager:
-    def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    def __init__(self, embeddings=None, cache_dir: str = VECTOR_CACHE_DIR,
+                 max_case_stores: Optional[int] = None, query_cache_size: Optional[int] = None):
+        # Falls back to the process-wide model, loaded on first use
+        self._embeddings = embeddings
+        self.cache_dir = cache_dir
         self.legal_knowledge_store = None
-        self.case_data_store = {}
+        # case_id -> index, least recently used first
+        self.case_data_store: "OrderedDict[str, FAISS]" = OrderedDict()
+        self.max_case_stores = max_case_stores or int(os.getenv("MAX_CASE_INDEXES", "32"))
+        self._case_keys = {}
+        self._case_lock = threading.Lock()
+        # normalized query -> embedding, least recently used first
+        self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.query_cache_size = query_cache_size or int(os.getenv("QUERY_CACHE_SIZE", "2048"))
+        self.query_cache_hits = 0
+        self.query_cache_misses = 0
+        self._query_lock = threading.Lock()
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = get_embeddings()
+        return self._embeddings
+
+    def _corpus_key(self, texts: List[str], namespace: str) -> str:
+        """Cache key from the embedding model name and every text in the corpus"""
+        model_name = getattr(self.embeddings, "model_name", type(self.embeddings).__name__)
+        digest = hashlib.sha256(model_name.encode("utf-8"))
+        for text in texts:
+            digest.update(b"\0")
+            digest.update(text.encode("utf-8"))
+        return f"{namespace}-{digest.hexdigest()[:24]}"
+
+    def _load_or_build(self, texts: List[str], namespace: str) -> "FAISS":
+        """Load a saved index for this exact corpus, or embed it and save the result"""
+        # Imported on first use, keeping langchain and faiss out of server startup
+        from langchain.vectorstores import FAISS
+        if not self.cache_dir:
+            return FAISS.from_texts(texts, self.embeddings)
+
+        path = os.path.join(self.cache_dir, self._corpus_key(texts, namespace))
+        if os.path.isdir(path):
+            try:
+                return FAISS.load_local(path, self.embeddings)
+            except Exception:
+                # Unreadable cache entry, rebuild it below
+                shutil.rmtree(path, ignore_errors=True)
+
+        store = FAISS.from_texts(texts, self.embeddings)
+        # Write to a temporary folder first so readers never see a partial index
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        try:
+            store.save_local(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return store
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a search query, serving repeated questions from the LRU cache"""
+        key = normalize_query(query)
+        with self._query_lock:
+            vector = self._query_cache.get(key)
+            if vector is not None:
+                self._query_cache.move_to_end(key)
+                self.query_cache_hits += 1
+                return vector
+            self.query_cache_misses += 1
+
+        with EMBEDDING_DURATION.time(kind="query"):
+            vector = self.embeddings.embed_query(key)
+        with self._query_lock:
+            self._query_cache[key] = vector
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return vector
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed several search queries, batching every cache miss into one encode call"""
+        keys = [normalize_query(query) for query in queries]
+        vectors: List[Optional[List[float]]] = [None] * len(keys)
+        missing: Dict[str, List[int]] = {}
+        with self._query_lock:
+            for index, key in enumerate(keys):
+                vector = self._query_cache.get(key)
+                if vector is not None:
+                    self._query_cache.move_to_end(key)
+                    self.query_cache_hits += 1
+                    vectors[index] = vector
+                else:
+                    self.query_cache_misses += 1
+                    missing.setdefault(key, []).append(index)
+
+        if missing:
+            missing_keys = list(missing)
+            with EMBEDDING_DURATION.time(kind="query_batch"):
+                embedded = self.embeddings.embed_documents(missing_keys)
+            with self._query_lock:
+                for key, vector in zip(missing_keys, embedded):
+                    for index in missing[key]:
+                        vectors[index] = vector
+                    self._query_cache[key] = vector
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return vectors
+
+    def query_cache_stats(self) -> Dict[str, Any]:
+        lookups = self.query_cache_hits + self.query_cache_misses
+        return {
+            "size": len(self._query_cache),
+            "max_size": self.query_cache_size,
+            "hits": self.query_cache_hits,
+            "misses": self.query_cache_misses,
+            "hit_rate": self.query_cache_hits / lookups if lookups else 0.0
+        }
 
     def add_legal_knowledge(self, texts: List[str]):
-        self.legal_knowledge_store = FAISS.from_texts(texts, self.embeddings)
+        self.legal_knowledge_store = self._load_or_build(texts, "legal")
 
     def add_case_data(self, texts: List[str], case_id: str):
-        self.case_data_store[case_id] = FAISS.from_texts(texts, self.embeddings)
+        """Index a case's texts, reusing the existing index while the texts are unchanged"""
+        key = self._corpus_key(texts, f"case-{case_id}")
+        with self._case_lock:
+            if self._case_keys.get(case_id) == key and case_id in self.case_data_store:
+                self.case_data_store.move_to_end(case_id)
+                return
+
+            self.case_data_store[case_id] = self._load_or_build(texts, f"case-{case_id}")
+            self.case_data_store.move_to_end(case_id)
+            self._case_keys[case_id] = key
+
+            while len(self.case_data_store) > self.max_case_stores:
+                evicted_id, _ = self.case_data_store.popitem(last=False)
+                self._case_keys.pop(evicted_id, None)
+
+    def has_case_data(self, case_id: str) -> bool:
+        return case_id in self.case_data_store
+
+    def _case_store(self, case_id: Optional[str]):
+        """A case's index, marked as the most recently used so cases still being played are not evicted"""
+        if not case_id:
+            return None
+        with self._case_lock:
+            store = self.case_data_store.get(case_id)
+            if store is not None:
+                self.case_data_store.move_to_end(case_id)
+        return store
 
     def search_legal_knowledge(self, query: str, k: int = 3) -> List[str]:
         if not self.legal_knowledge_store:
             return []
-        docs = self.legal_knowledge_store.similarity_search(query, k=k)
+        vector = self.embed_query(query)
+        with VECTOR_SEARCH_DURATION.time(index="legal"):
+            docs = self.legal_knowledge_store.similarity_search_by_vector(vector, k=k)
         return [doc.page_content for doc in docs]
 
+    def search_context(self, legal_query: str, case_query: str, case_id: Optional[str],
+                       legal_k: int = 3, case_k: int = 5) -> Dict[str, List[str]]:
+        """Search the legal and case indexes, embedding both queries in a single pass"""
+        return self.search_contexts([(legal_query, case_query)], case_id, legal_k, case_k)[0]
+
+    def search_contexts(self, query_pairs: List[Tuple[str, str]], case_id: Optional[str],
+                        legal_k: int = 3, case_k: int = 5) -> List[Dict[str, List[str]]]:
+        """search_context for several (legal query, case query) pairs, embedding all of them in one pass"""
+        vectors = self.embed_queries([query for pair in query_pairs for query in pair])
+        store = self._case_store(case_id)
+
+        results = []
+        for legal_vector, case_vector in zip(vectors[0::2], vectors[1::2]):
+            legal_rules = []
+            if self.legal_knowledge_store:
+                with VECTOR_SEARCH_DURATION.time(index="legal"):
+                    docs = self.legal_knowledge_store.similarity_search_by_vector(legal_vector, k=legal_k)
+                legal_rules = [doc.page_content for doc in docs]
+
+            case_context = []
+            if store is not None:
+                with VECTOR_SEARCH_DURATION.time(index="case"):
+                    docs = store.similarity_search_by_vector(case_vector, k=case_k)
+                case_context = [doc.page_content for doc in docs]
+
+            results.append({"legal_rules": legal_rules, "case_context": case_context})
+        return results
+
     def search_case_data(self, query: str, k: int = 5, case_id: str = None) -> List[str]:
-        if not case_id or case_id not in self.case_data_store:
+        store = self._case_store(case_id)
+        if store is None:
             return []
-        docs = self.case_data_store[case_id].similarity_search(query, k=k)
-        return [doc.page_content for doc in docs] 
\ No newline at end of file
+        vector = self.embed_query(query)
+        with VECTOR_SEARCH_DURATION.time(index="case"):
+            docs = store.similarity_search_by_vector(vector, k=k)
+        return [doc.page_content for doc in docs]
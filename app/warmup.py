@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Step = Tuple[str, Callable[[], Any]]
+
+
+class WarmupProgress:
+    """Runs the server's startup warm-up steps in order and reports their progress.
+
+    The server binds before warm-up finishes; /readyz reports this progress and
+    only succeeds once every step has completed.
+    """
+
+    def __init__(self):
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._steps: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None and self.error is None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    def run(self, steps: List[Step]):
+        """Run every step, stopping at the first failure"""
+        with self._lock:
+            self.started_at = time.time()
+            self._steps = OrderedDict((name, {"name": name, "status": "pending"}) for name, _ in steps)
+
+        for name, step in steps:
+            record = self._steps[name]
+            record["status"] = "running"
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                record["status"] = "failed"
+                self.error = f"{name}: {e}"
+                print(f"❌ Warm-up step {name} failed: {e}")
+                return
+            finally:
+                record["seconds"] = round(time.perf_counter() - started, 3)
+            record["status"] = "done"
+
+        self.finished_at = time.time()
+        print(f"✅ Warm-up finished in {self.finished_at - self.started_at:.1f}s")
+
+    def start(self, steps: List[Step]) -> threading.Thread:
+        """Run the steps on a background thread"""
+        thread = threading.Thread(target=self.run, args=(steps,), name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def report(self) -> Dict[str, Any]:
+        if self.failed:
+            status = "failed"
+        elif self.ready:
+            status = "ready"
+        else:
+            status = "warming_up" if self.started_at else "not_started"
+        end = self.finished_at or time.time()
+        return {
+            "status": status,
+            "elapsed_seconds": round(end - self.started_at, 3) if self.started_at else 0.0,
+            "steps": [dict(record) for record in self._steps.values()],
+            "error": self.error
+        }
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Offline micro-benchmarks for the CourtroomAI game engine.
+Plays complete games through CourtroomGameEngine with a fake chat model and
+hashed embeddings, so no network access or model download is needed, and
+reports latency and memory allocations per operation.
+
+Usage:
+    python benchmarks/bench_engine.py [--iterations 50] [--llm-latency-ms 0]
+    python benchmarks/bench_engine.py --save baseline.json
+    python benchmarks/bench_engine.py --compare baseline.json [--threshold 25]
+
+With --compare the exit status is 1 when any operation got slower, or
+allocates more, by more than --threshold percent.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from statistics import mean
+from typing import Any, Callable, Dict, List
+
+# Add the app directory to Python path
+project_root = Path(__file__).resolve().parent.parent
+app_dir = project_root / "app"
+sys.path.insert(0, str(app_dir))
+
+QUESTIONS = [
+    "Where were you when the crime happened?",
+    "What time did you arrive, and can anyone confirm your alibi?",
+    "Did you see anyone near the storage room?",
+    "How certain are you about the timeline that evening?",
+    "Who else had the opportunity to take the necklace?",
+]
+
+STATEMENTS = [
+    "Your Honor, the timeline inconsistency creates reasonable doubt.",
+    "The prosecution has not met its burden of proof on opportunity.",
+    "The evidence points to an alternative suspect.",
+]
+
+# Latency changes smaller than this are noise, whatever the percentage
+MIN_LATENCY_CHANGE_MS = 0.05
+MIN_ALLOCATION_CHANGE_KIB = 1.0
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _check(result: Any) -> Any:
+    """Fail loudly when an action is rejected, since its timing would be meaningless"""
+    if isinstance(result, dict) and "error" in result:
+        raise RuntimeError(result["error"])
+    return result
+
+
+class Recorder:
+    """Collects per-operation timings, or allocations when tracemalloc is running"""
+
+    def __init__(self, trace_allocations: bool):
+        self.trace_allocations = trace_allocations
+        self.latencies: Dict[str, List[float]] = {}
+        self.peaks: Dict[str, List[int]] = {}
+        self.retained: Dict[str, List[int]] = {}
+
+    def run(self, name: str, fn: Callable, *args) -> Any:
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            result = _check(fn(*args))
+            current, peak = tracemalloc.get_traced_memory()
+            self.peaks.setdefault(name, []).append(peak - before)
+            self.retained.setdefault(name, []).append(current - before)
+            return result
+
+        started = time.perf_counter()
+        result = _check(fn(*args))
+        self.latencies.setdefault(name, []).append(time.perf_counter() - started)
+        return result
+
+
+def build_engine(llm_latency: float, llm_jitter: float = 0.0):
+    """A shared engine wired to the offline fakes, with its vector stores built"""
+    from game_engine import CourtroomGameEngine
+    from vector_store import VectorStoreManager
+    from response_cache import SemanticResponseCache
+    from pregenerated import PregeneratedResponses
+    from fakes import FakeChatModel, HashedEmbeddings
+
+    engine = CourtroomGameEngine(
+        groq_client=FakeChatModel(latency=llm_latency, jitter=llm_jitter),
+        # No on-disk index cache, so runs do not depend on earlier ones
+        vector_store_manager=VectorStoreManager(embeddings=HashedEmbeddings(), cache_dir=""),
+        # A threshold above 1 never matches, so every question reaches the LLM
+        response_cache=SemanticResponseCache(threshold=1.01),
+        pregenerated=PregeneratedResponses()
+    )
+    engine._initialize_vector_stores()
+    # Mark every case as pre-generated with nothing in it, so introductions and
+    # rulings are timed through the LLM instead of racing a background pool
+    from case_data import CASE_DATABASE
+    for case_id in CASE_DATABASE:
+        engine.pregenerated.generate_case(case_id, {}, engine._pregenerate_llm)
+    return engine
+
+
+def play_game(engine, recorder: Recorder, case_id: str, iteration: int):
+    """One game through every engine action, in a fresh session"""
+    from case_data import CASE_DATABASE
+    case = CASE_DATABASE[case_id]
+    witness = case.witnesses[iteration % len(case.witnesses)]
+    evidence = case.evidence[iteration % len(case.evidence)]
+
+    session = engine.new_session()
+    recorder.run("start_case", session.start_case, case_id)
+    recorder.run("call_witness", session.call_witness, witness.name)
+    for offset in range(2):
+        recorder.run("question_witness", session.question_witness, QUESTIONS[(iteration + offset) % len(QUESTIONS)])
+    recorder.run("use_evidence", session.use_evidence, evidence.id)
+    recorder.run("get_clue", session.get_clue)
+    recorder.run("chat_with_judge", session.chat_with_judge, STATEMENTS[iteration % len(STATEMENTS)])
+    recorder.run("get_verdict", session.get_verdict)
+
+
+_response_field = None
+
+
+def fastapi_serialize(model) -> bytes:
+    """What FastAPI does with a model returned by a route declaring response_model=GameResponse:
+    validate it against the response field, serialize it to plain data, then render it with the stdlib json encoder.
+    """
+    global _response_field
+    from fastapi.responses import JSONResponse
+    from fastapi.utils import create_response_field
+    from models import GameResponse
+
+    if _response_field is None:
+        _response_field = create_response_field(name="response", type_=GameResponse)
+    value, _ = _response_field.validate(model, {}, loc=("response",))
+    return JSONResponse(_response_field.serialize(value, by_alias=True)).body
+
+
+def run_stages(engine, recorder: Recorder, case_id: str, iteration: int):
+    """The scoring, retrieval and serialization steps of an action on their own"""
+    from models import GameResponse
+    from responses import FastJSONResponse
+
+    session = engine.new_session()
+    session.start_case(case_id)
+    witness = session.current_case.witnesses[0]
+    session.call_witness(witness.name)
+    question = QUESTIONS[iteration % len(QUESTIONS)]
+
+    context = recorder.run("retrieve_context", session._retrieve_relevant_context, question, witness.name)
+    response = session._generate_witness_response(question, witness, context)
+    recorder.run("check_clue_revelation", session._check_clue_revelation, question, response.content)
+    recorder.run("score_question", session._calculate_question_points, question, response, context)
+    recorder.run("evaluate_legal_statement", session._evaluate_legal_statement, STATEMENTS[iteration % len(STATEMENTS)])
+
+    data = session._record_question(question, witness, context, response)
+    
+    def build_response() -> GameResponse:
+        return GameResponse(
+            success=True, message="Question processed", data=data,
+            game_state=session.get_game_state(), points_earned=data["points_earned"]
+        )
+    
+    # The routes' path, against FastAPI's handling of a model returned with a response_model
+    recorder.run("serialize_response", lambda: FastJSONResponse(build_response()).body)
+    recorder.run("serialize_response_fastapi", lambda: fastapi_serialize(build_response()))
+
+
+def run_cached_questions(engine, cache, recorder: Recorder, case_id: str, iteration: int):
+    """question_witness answered from the semantic response cache"""
+    session = engine.new_session()
+    session.response_cache = cache
+    session.start_case(case_id)
+    session.call_witness(session.current_case.witnesses[0].name)
+    question = QUESTIONS[iteration % len(QUESTIONS)]
+    recorder.run("question_witness_cached", session.question_witness, question)
+
+
+def run_benchmarks(engine, cache, case_id: str, iterations: int, warmup: int,
+                   trace_allocations: bool) -> Recorder:
+    recorder = Recorder(trace_allocations)
+    warmup_recorder = Recorder(False)
+    for iteration in range(warmup + iterations):
+        target = recorder if iteration >= warmup else warmup_recorder
+        play_game(engine, target, case_id, iteration)
+        run_stages(engine, target, case_id, iteration)
+        run_cached_questions(engine, cache, target, case_id, iteration)
+    return recorder
+
+
+def summarize(timings: Recorder, allocations: Recorder) -> Dict[str, Dict[str, float]]:
+    operations = {}
+    for name, latencies in timings.latencies.items():
+        operations[name] = {
+            "calls": len(latencies),
+            "mean_ms": round(mean(latencies) * 1000, 4),
+            "p50_ms": round(_percentile(latencies, 50) * 1000, 4),
+            "p95_ms": round(_percentile(latencies, 95) * 1000, 4),
+            "max_ms": round(max(latencies) * 1000, 4),
+            "peak_kib": round(mean(allocations.peaks.get(name, [0])) / 1024, 2),
+            "retained_kib": round(mean(allocations.retained.get(name, [0])) / 1024, 2),
+        }
+    return operations
+
+
+def print_report(operations: Dict[str, Dict[str, float]]):
+    print(f"{'operation':<26}{'calls':>7}{'mean ms':>11}{'p50 ms':>11}{'p95 ms':>11}{'peak KiB':>11}{'kept KiB':>11}")
+    for name, stats in operations.items():
+        print(f"{name:<26}{stats['calls']:>7}{stats['mean_ms']:>11.3f}{stats['p50_ms']:>11.3f}"
+              f"{stats['p95_ms']:>11.3f}{stats['peak_kib']:>11.1f}{stats['retained_kib']:>11.1f}")
+
+
+def compare(operations: Dict[str, Dict[str, float]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print the change against a baseline and return the operations that regressed"""
+    regressions = []
+    print(f"\n{'operation':<26}{'p50 ms':>22}{'peak KiB':>22}")
+    for name, stats in operations.items():
+        before = baseline["operations"].get(name)
+        if before is None:
+            print(f"{name:<26}{'(new)':>22}")
+            continue
+
+        changes = []
+        regressed = False
+        for key, floor in (("p50_ms", MIN_LATENCY_CHANGE_MS), ("peak_kib", MIN_ALLOCATION_CHANGE_KIB)):
+            old, new = before[key], stats[key]
+            percent = (new - old) / old * 100 if old else 0.0
+            changes.append(f"{old:.3f} → {new:.3f} ({percent:+.0f}%)")
+            if percent > threshold and new - old > floor:
+                regressed = True
+        marker = "  ❌" if regressed else ""
+        print(f"{name:<26}{changes[0]:>22}{changes[1]:>22}{marker}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game engine offline")
+    parser.add_argument("--case", default="case_001", help="Case id to play")
+    parser.add_argument("--iterations", type=int, default=50, help="Games to time")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed games played first")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0,
+                        help="Latency of each fake LLM call. 0 measures engine overhead only")
+    parser.add_argument("--save", help="Write the results to this baseline file")
+    parser.add_argument("--compare", help="Compare the results with this baseline file")
+    parser.add_argument("--threshold", type=float, default=25.0,
+                        help="Percent slowdown or allocation growth reported as a regression")
+    args = parser.parse_args()
+
+    from response_cache import SemanticResponseCache
+
+    setup_started = time.perf_counter()
+    engine = build_engine(args.llm_latency_ms / 1000)
+    setup_seconds = time.perf_counter() - setup_started
+    # A normal cache, for the cached question benchmark
+    cache = SemanticResponseCache()
+
+    print(f"⚖️  Benchmarking {args.case}: {args.iterations} games, fake LLM latency {args.llm_latency_ms} ms")
+    timings = run_benchmarks(engine, cache, args.case, args.iterations, args.warmup, trace_allocations=False)
+    # Allocations are measured in a separate pass, as tracemalloc slows everything down
+    tracemalloc.start()
+    try:
+        allocations = run_benchmarks(engine, cache, args.case, max(args.iterations // 5, 1), 0,
+                                     trace_allocations=True)
+    finally:
+        tracemalloc.stop()
+
+    operations = summarize(timings, allocations)
+    print_report(operations)
+
+    results = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "case": args.case,
+            "iterations": args.iterations,
+            "llm_latency_ms": args.llm_latency_ms,
+            "setup_seconds": round(setup_seconds, 3),
+        },
+        "operations": operations,
+    }
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("llm_latency_ms") != args.llm_latency_ms:
+            print("⚠️  Baseline was recorded with a different --llm-latency-ms")
+        regressions = compare(operations, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Regressed by more than {args.threshold:.0f}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
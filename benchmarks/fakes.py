@@ -0,0 +1,118 @@
+"""
+Offline stand-ins for the Groq chat model and the embedding model, so the
+engine can be benchmarked with no network and no model download.
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+import time
+from typing import AsyncIterator, List
+
+import numpy as np
+from langchain.schema.embeddings import Embeddings
+from langchain.schema.messages import AIMessage, AIMessageChunk
+from langchain.schema.output import ChatGeneration, LLMResult
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+class FakeChatModel:
+    """Answers every prompt with a canned reply after a set latency.
+
+    Implements the parts of the ChatGroq interface the engine uses: invoke,
+    ainvoke, astream, generate and agenerate. The reply is picked from
+    ``replies`` by a hash of the prompt, so runs are deterministic. Each call
+    takes ``latency`` plus up to ``jitter`` seconds, drawn from a seeded RNG.
+    Streaming spreads that time across the reply's words.
+    """
+
+    DEFAULT_REPLIES = [
+        "I was in the kitchen around nine, and the back door was unlocked when I left.",
+        "I saw someone wearing gloves near the storage room, but I could not see their face.",
+        "The timeline in my statement is accurate. I arrived at eight thirty and left before ten.",
+        "Objection noted. The court will consider the relevance of this evidence to the alibi.",
+        "The evidence raises reasonable doubt, but the burden of proof remains with the prosecution.",
+    ]
+
+    def __init__(self, latency: float = 0.0, replies: List[str] = None,
+                 prompt_tokens: int = 400, completion_tokens: int = 80,
+                 jitter: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self.replies = replies or self.DEFAULT_REPLIES
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.calls = 0
+
+    def _reply(self, messages) -> str:
+        self.calls += 1
+        prompt = messages[-1].content
+        digest = hashlib.blake2b(prompt.encode("utf-8"), digest_size=4).digest()
+        return self.replies[int.from_bytes(digest, "little") % len(self.replies)]
+
+    def _delay(self) -> float:
+        return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _result(self, content: str) -> LLMResult:
+        return LLMResult(
+            generations=[[ChatGeneration(message=AIMessage(content=content))]],
+            llm_output={"token_usage": {
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens
+            }}
+        )
+
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        return AIMessage(content=self._reply(messages))
+
+    async def ainvoke(self, messages, **kwargs) -> AIMessage:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return AIMessage(content=self._reply(messages))
+
+    async def astream(self, messages, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        words = self._reply(messages).split(" ")
+        delay = self._delay() / len(words)
+        for index, word in enumerate(words):
+            await asyncio.sleep(delay)
+            yield AIMessageChunk(content=word if index == 0 else f" {word}")
+
+    def generate(self, message_batches, **kwargs) -> LLMResult:
+        return self._result(self.invoke(message_batches[0]).content)
+
+    async def agenerate(self, message_batches, **kwargs) -> LLMResult:
+        return self._result((await self.ainvoke(message_batches[0])).content)
+
+
+class HashedEmbeddings(Embeddings):
+    """Deterministic bag-of-words embeddings: each word is hashed into one of ``dim`` buckets.
+
+    Texts sharing words get similar vectors, which keeps retrieval and the
+    semantic response cache meaningful without loading a model.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.model_name = f"hashed-bow-{dim}"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in _WORD.findall(text.lower()):
+            digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+            vector[int.from_bytes(digest, "little") % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Load test for the CourtroomAI API.
+Runs virtual players that each replay a scripted game (start a case, call a
+witness, question them, present evidence, get the verdict) over and over,
+ramping the number of simultaneous players up in stages. Each stage reports
+throughput, p50/p95/p99 latency and error rate.
+
+By default the FastAPI app runs in this process, driven through httpx's ASGI
+transport, with the offline fake LLM from benchmarks/fakes.py answering after
+--llm-latency-ms. The players share the event loop with the server, so
+client overhead is included in the numbers. Use --url to load a running server
+instead.
+
+Usage:
+    python benchmarks/load_test.py [--stages 1,5,10,25,50] [--duration 10] [--llm-latency-ms 300]
+    python benchmarks/load_test.py --url http://localhost:8000 --stages 5,10
+    python benchmarks/load_test.py --script game.json --output results.json
+
+A script file is a JSON list of steps like
+{"method": "POST", "path": "/question_witness", "json": {"question": "..."}}.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from statistics import mean
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Add the app directory to Python path
+project_root = Path(__file__).resolve().parent.parent
+app_dir = project_root / "app"
+sys.path.insert(0, str(app_dir))
+
+SESSION_HEADER = "X-Session-ID"
+
+DEFAULT_SCRIPT = [
+    {"method": "POST", "path": "/start_case", "json": {"case_id": "case_001"}},
+    {"method": "POST", "path": "/call_witness", "json": {"witness_name": "Alice Monroe"}},
+    {"method": "POST", "path": "/question_witness", "json": {"question": "Where were you when the necklace went missing?"}},
+    {"method": "POST", "path": "/question_witness", "json": {"question": "Can anyone confirm your alibi that evening?"}},
+    {"method": "POST", "path": "/question_witness", "json": {"question": "How certain are you about the timeline?"}},
+    {"method": "POST", "path": "/use_evidence", "json": {"evidence_id": "E1"}},
+    {"method": "GET", "path": "/verdict"},
+]
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class StageResults:
+    """Request outcomes of one concurrency stage"""
+
+    def __init__(self, players: int):
+        self.players = players
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.games = 0
+        self.failed_games = 0
+        self.elapsed = 0.0
+
+    def record(self, path: str, latency: float, ok: bool):
+        self.latencies.setdefault(path, []).append(latency)
+        if not ok:
+            self.errors[path] = self.errors.get(path, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = [latency for values in self.latencies.values() for latency in values]
+        requests = len(latencies)
+        errors = sum(self.errors.values())
+        return {
+            "players": self.players,
+            "games": self.games,
+            "failed_games": self.failed_games,
+            "requests": requests,
+            "errors": errors,
+            "error_rate": errors / requests if requests else 0.0,
+            "requests_per_second": requests / self.elapsed if self.elapsed else 0.0,
+            "games_per_second": self.games / self.elapsed if self.elapsed else 0.0,
+            "mean_ms": mean(latencies) * 1000 if latencies else 0.0,
+            "p50_ms": _percentile(latencies, 50) * 1000,
+            "p95_ms": _percentile(latencies, 95) * 1000,
+            "p99_ms": _percentile(latencies, 99) * 1000,
+            "routes": {
+                path: {
+                    "requests": len(values),
+                    "errors": self.errors.get(path, 0),
+                    "p50_ms": _percentile(values, 50) * 1000,
+                    "p95_ms": _percentile(values, 95) * 1000,
+                    "p99_ms": _percentile(values, 99) * 1000,
+                }
+                for path, values in self.latencies.items()
+            },
+        }
+
+
+async def play(client: httpx.AsyncClient, script: List[Dict[str, Any]], results: StageResults, deadline: float):
+    """Replay the script as one player until the stage ends, finishing the game in progress"""
+    while time.monotonic() < deadline:
+        session_id: Optional[str] = None
+        completed = True
+        for step in script:
+            headers = {SESSION_HEADER: session_id} if session_id else {}
+            started = time.perf_counter()
+            try:
+                response = await client.request(step["method"], step["path"], json=step.get("json"), headers=headers)
+                ok = response.is_success
+            except Exception:
+                # Including errors the in-process app raises through the ASGI transport
+                response, ok = None, False
+            results.record(step["path"], time.perf_counter() - started, ok)
+
+            if response is not None and SESSION_HEADER in response.headers:
+                session_id = response.headers[SESSION_HEADER]
+            if not ok:
+                completed = False
+                if session_id is None:
+                    # Without a session the rest of the game cannot be played
+                    break
+        if completed:
+            results.games += 1
+        else:
+            results.failed_games += 1
+
+
+async def run_stage(make_client, script: List[Dict[str, Any]], players: int, duration: float) -> StageResults:
+    # A client per player, as the session cookie must not leak between players
+    clients = [make_client() for _ in range(players)]
+    results = StageResults(players)
+    started = time.monotonic()
+    deadline = started + duration
+    try:
+        await asyncio.gather(*(play(client, script, results, deadline) for client in clients))
+    finally:
+        results.elapsed = time.monotonic() - started
+        await asyncio.gather(*(client.aclose() for client in clients))
+    return results
+
+
+def build_app(llm_latency: float, llm_jitter: float):
+    """Import the FastAPI app with its shared engine wired to the offline fakes"""
+    from bench_engine import build_engine
+    from session_manager import SessionManager
+    import main
+
+    main.session_manager = SessionManager(shared_engine=build_engine(llm_latency, llm_jitter))
+    # The ASGI transport sends no startup event, so warm up here before the first stage
+    main.warmup.run(main.warm_up_steps())
+    return main.app
+
+
+def print_stage(summary: Dict[str, Any], per_route: bool):
+    print(f"{summary['players']:>8}{summary['requests']:>10}{summary['requests_per_second']:>10.1f}"
+          f"{summary['games_per_second']:>9.2f}{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}"
+          f"{summary['p99_ms']:>10.1f}{summary['error_rate'] * 100:>9.2f}%")
+    if per_route:
+        for path, route in summary["routes"].items():
+            print(f"{'':>8}  {path:<28}{route['requests']:>7}{route['p50_ms']:>10.1f}"
+                  f"{route['p95_ms']:>10.1f}{route['p99_ms']:>10.1f}{route['errors']:>7} errors")
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    script = DEFAULT_SCRIPT
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = json.load(f)
+
+    if args.url:
+        transport, base_url = None, args.url
+    else:
+        transport = httpx.ASGITransport(app=build_app(args.llm_latency_ms / 1000, args.llm_jitter_ms / 1000))
+        base_url = "http://loadtest"
+
+    def make_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout)
+
+    summaries = []
+    print(f"{'players':>8}{'requests':>10}{'req/s':>10}{'games/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>10}")
+    for players in (int(players) for players in args.stages.split(",")):
+        results = await run_stage(make_client, script, players, args.duration)
+        summary = results.summary()
+        summaries.append(summary)
+        print_stage(summary, args.per_route)
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API with concurrent scripted players")
+    parser.add_argument("--stages", default="1,5,10,25,50", help="Comma-separated player counts to ramp through")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds each stage runs for")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="Latency of each fake LLM call")
+    parser.add_argument("--llm-jitter-ms", type=float, default=100.0, help="Random extra latency of each fake LLM call")
+    parser.add_argument("--url", help="Load a running server instead of the in-process app")
+    parser.add_argument("--script", help="JSON file with the steps of one game")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Request timeout in seconds")
+    parser.add_argument("--per-route", action="store_true", help="Also report latency per route")
+    parser.add_argument("--output", help="Write every stage's results to this JSON file")
+    args = parser.parse_args()
+
+    if args.url:
+        print(f"🎯 Loading {args.url}")
+    else:
+        print(f"🎯 Loading the in-process app, fake LLM latency {args.llm_latency_ms} ms + up to {args.llm_jitter_ms} ms")
+    summaries = asyncio.run(run(args))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"stages": summaries}, f, indent=2)
+        print(f"💾 Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for an OpenAI-compatible chat completions API.
+Answers /v1/chat/completions with canned witness and judge replies after a
+configurable latency, streamed or not, and can fail a share of requests with
+429/503 to exercise retries. Point the game server at it to run throughput
+tests offline:
+
+    python benchmarks/mock_llm_server.py --port 8001 --latency-ms 300
+    LLM_BASE_URL=http://localhost:8001/v1 python run_server.py
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLIES = [
+    "I was in the kitchen around nine, and the back door was unlocked when I left.",
+    "I saw someone wearing gloves near the storage room, but I could not see their face.",
+    "The timeline in my statement is accurate. I arrived at eight thirty and left before ten.",
+    "Objection noted. The court will consider the relevance of this evidence to the alibi.",
+    "The evidence raises reasonable doubt, but the burden of proof remains with the prosecution.",
+]
+
+
+def create_app(latency: float = 0.3, jitter: float = 0.1, tokens_per_second: float = 200.0,
+               error_rate: float = 0.0, seed: int = 0) -> FastAPI:
+    """The mock API. Each call waits ``latency`` plus up to ``jitter`` seconds before its first token."""
+    app = FastAPI(title="Mock OpenAI-compatible LLM")
+    rng = random.Random(seed)
+
+    def reply_for(messages: List[Dict[str, Any]]) -> str:
+        prompt = messages[-1].get("content", "") if messages else ""
+        digest = hashlib.blake2b(prompt.encode("utf-8"), digest_size=4).digest()
+        return REPLIES[int.from_bytes(digest, "little") % len(REPLIES)]
+
+    def usage(messages: List[Dict[str, Any]], reply: str) -> Dict[str, int]:
+        prompt_tokens = sum(len(str(message.get("content", "")).split()) for message in messages)
+        completion_tokens = len(reply.split())
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+
+    def injected_error() -> Optional[JSONResponse]:
+        if error_rate and rng.random() < error_rate:
+            if rng.random() < 0.5:
+                return JSONResponse({"error": {"message": "Rate limit reached"}}, status_code=429,
+                                    headers={"Retry-After": "0.1"})
+            return JSONResponse({"error": {"message": "Service unavailable"}}, status_code=503)
+        return None
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        model = body.get("model", "mock")
+        error = injected_error()
+        if error is not None:
+            return error
+
+        reply = reply_for(messages)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        await asyncio.sleep(latency + (rng.uniform(0, jitter) if jitter else 0.0))
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": usage(messages, reply)
+            }
+
+        async def events():
+            words = reply.split(" ")
+            for index, word in enumerate(words):
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word if index == 0 else f" {word}"},
+                                 "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if tokens_per_second:
+                    await asyncio.sleep(1 / tokens_per_second)
+            final = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "usage": usage(messages, reply)
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a mock OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Time to the first token")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="Random extra latency per call")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Streaming speed, 0 for no delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls failed with 429 or 503")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms / 1000, args.jitter_ms / 1000, args.tokens_per_second,
+                     args.error_rate, args.seed)
+    print(f"🤖 Mock LLM listening on http://{args.host}:{args.port}/v1")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Redis server, enough for the Redis session store.
+Speaks RESP2 and supports PING, AUTH, SELECT, GET, SET (with EX/PX), DEL,
+EXISTS, EXPIRE, TTL, DBSIZE, FLUSHDB and optimistic transactions with
+WATCH/MULTI/EXEC/DISCARD/UNWATCH. Data lives in memory and is lost on exit.
+Run it to try several workers sharing sessions without installing Redis:
+
+    python benchmarks/mock_redis_server.py --port 6380
+    SESSION_STORE=redis://localhost:6380/0 python run_server.py --workers 4
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RedisError(Exception):
+    """Sent to the client as an error reply"""
+
+
+def _encode(reply: Any) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, RedisError):
+        return b"-ERR %s\r\n" % str(reply).encode("utf-8")
+    if isinstance(reply, bool):
+        return b":%d\r\n" % int(reply)
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, str):
+        return b"+%s\r\n" % reply.encode("utf-8")
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    if isinstance(reply, list):
+        return b"*%d\r\n" % len(reply) + b"".join(_encode(item) for item in reply)
+    raise TypeError(f"Cannot encode {reply!r}")
+
+
+class Keyspace:
+    """Keys with optional expiry, and a revision per key that WATCH compares"""
+
+    def __init__(self):
+        self.values: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.revisions: Dict[bytes, int] = {}
+
+    def _touch(self, key: bytes):
+        self.revisions[key] = self.revisions.get(key, 0) + 1
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        entry = self.values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.values[key]
+            self._touch(key)
+            return None
+        return value
+
+    def set(self, key: bytes, value: bytes, ttl: Optional[float] = None):
+        self.values[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+        self._touch(key)
+
+    def delete(self, key: bytes) -> bool:
+        if self.get(key) is None:
+            return False
+        del self.values[key]
+        self._touch(key)
+        return True
+
+    def revision(self, key: bytes) -> int:
+        self.get(key)
+        return self.revisions.get(key, 0)
+
+
+class Connection:
+    """One client's selected database and transaction state"""
+
+    def __init__(self, databases: Dict[int, Keyspace]):
+        self.databases = databases
+        self.db = 0
+        self.watched: Dict[Tuple[int, bytes], int] = {}
+        self.queued: Optional[List[List[bytes]]] = None
+
+    @property
+    def keyspace(self) -> Keyspace:
+        return self.databases.setdefault(self.db, Keyspace())
+
+    def handle(self, args: List[bytes]) -> Any:
+        name = args[0].decode("utf-8").upper()
+        if self.queued is not None and name not in ("EXEC", "DISCARD", "MULTI", "WATCH"):
+            self.queued.append(args)
+            return "QUEUED"
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            return RedisError(f"unknown command '{name}'")
+        try:
+            return handler(*args[1:])
+        except TypeError:
+            return RedisError(f"wrong number of arguments for '{name}' command")
+        except (RedisError, ValueError) as e:
+            return RedisError(str(e))
+
+    def cmd_ping(self, message: bytes = None):
+        return message if message is not None else "PONG"
+
+    def cmd_auth(self, *credentials):
+        return "OK"
+
+    def cmd_select(self, db: bytes):
+        self.db = int(db)
+        return "OK"
+
+    def cmd_get(self, key: bytes):
+        return self.keyspace.get(key)
+
+    def cmd_set(self, key: bytes, value: bytes, *options: bytes):
+        ttl = None
+        if options:
+            unit = options[0].upper()
+            if len(options) != 2 or unit not in (b"EX", b"PX"):
+                raise RedisError("syntax error")
+            ttl = float(options[1]) / (1000 if unit == b"PX" else 1)
+        self.keyspace.set(key, value, ttl)
+        return "OK"
+
+    def cmd_del(self, *keys: bytes):
+        return sum(self.keyspace.delete(key) for key in keys)
+
+    def cmd_exists(self, *keys: bytes):
+        return sum(self.keyspace.get(key) is not None for key in keys)
+
+    def cmd_expire(self, key: bytes, seconds: bytes):
+        value = self.keyspace.get(key)
+        if value is None:
+            return 0
+        self.keyspace.set(key, value, float(seconds))
+        return 1
+
+    def cmd_ttl(self, key: bytes):
+        if self.keyspace.get(key) is None:
+            return -2
+        expires_at = self.keyspace.values[key][1]
+        return -1 if expires_at is None else int(expires_at - time.monotonic())
+
+    def cmd_dbsize(self):
+        return sum(self.keyspace.get(key) is not None for key in list(self.keyspace.values))
+
+    def cmd_flushdb(self):
+        for key in list(self.keyspace.values):
+            self.keyspace.delete(key)
+        return "OK"
+
+    def cmd_watch(self, *keys: bytes):
+        if self.queued is not None:
+            raise RedisError("WATCH inside MULTI is not allowed")
+        for key in keys:
+            self.watched[(self.db, key)] = self.keyspace.revision(key)
+        return "OK"
+
+    def cmd_unwatch(self):
+        self.watched.clear()
+        return "OK"
+
+    def cmd_multi(self):
+        if self.queued is not None:
+            raise RedisError("MULTI calls can not be nested")
+        self.queued = []
+        return "OK"
+
+    def cmd_discard(self):
+        if self.queued is None:
+            raise RedisError("DISCARD without MULTI")
+        self.queued = None
+        self.watched.clear()
+        return "OK"
+
+    def cmd_exec(self):
+        if self.queued is None:
+            raise RedisError("EXEC without MULTI")
+        queued, self.queued = self.queued, None
+        changed = any(
+            self.databases.setdefault(db, Keyspace()).revision(key) != revision
+            for (db, key), revision in self.watched.items()
+        )
+        self.watched.clear()
+        if changed:
+            return None
+        # Commands run back to back on the event loop, so the transaction is atomic
+        return [self.handle(args) for args in queued]
+
+
+async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # Inline command, as typed into telnet or redis-cli
+        return line.split()
+    args = []
+    for _ in range(int(line[1:-2])):
+        header = await reader.readline()
+        length = int(header[1:-2])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
+
+
+def create_server(host: str, port: int):
+    """A coroutine starting the server, with its own empty databases"""
+    databases: Dict[int, Keyspace] = {}
+
+    async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = Connection(databases)
+        try:
+            while True:
+                args = await _read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                if args[0].upper() == b"QUIT":
+                    writer.write(_encode("OK"))
+                    break
+                writer.write(_encode(connection.handle(args)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    return asyncio.start_server(serve, host, port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Redis-protocol server for the session store")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args()
+
+    async def run():
+        server = await create_server(args.host, args.port)
+        print(f"🗄️  Mock Redis listening on redis://{args.host}:{args.port}/0")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
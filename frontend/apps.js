@@ -3,6 +3,16 @@ let gameState = null;
 let currentCase = null;
 let conversation = [];
 let loading = false;
+let sessionId = null;
+
+// Headers for API calls, carrying the player's session token
+function apiHeaders(extra = {}) {
+  const headers = { ...extra };
+  if (sessionId) {
+    headers['X-Session-ID'] = sessionId;
+  }
+  return headers;
+}
 
 // DOM elements
 const mainMenu = document.getElementById('main-menu');
@@ -109,6 +119,46 @@ function getSpeakerImage(speaker) {
   return speakerImages[speaker] || speakerImages['default'];
 }
 
+// POST to a streaming endpoint, calling onToken for each Server-Sent token event.
+// Resolves with the final GameResponse payload, rejects on an error event.
+async function streamAction(url, body, onToken) {
+  const res = await fetch(url, {
+    method: 'POST',
+    headers: apiHeaders({ 'Content-Type': 'application/json' }),
+    body: JSON.stringify(body)
+  });
+  if (!res.ok) {
+    throw new Error(`Request failed with status ${res.status}`);
+  }
+  
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      
+      const eventName = (rawEvent.match(/^event: (.*)$/m) || [])[1];
+      const payload = JSON.parse((rawEvent.match(/^data: (.*)$/m) || [])[1] || '{}');
+      if (eventName === 'token') {
+        onToken(payload.content);
+      } else if (eventName === 'result') {
+        return payload;
+      } else if (eventName === 'error') {
+        throw new Error(payload.detail);
+      }
+    }
+  }
+  throw new Error('Stream ended without a result');
+}
+
 function setLoading(state) {
   loading = state;
   document.body.style.cursor = loading ? 'wait' : 'default';
@@ -276,16 +326,19 @@ function loadGameRules() {
 
 function startGame() {
   setLoading(true);
-  fetch('http://localhost:8000/start_case', {
+  fetch('http://localhost:8000/bootstrap', {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
+    headers: apiHeaders({ 'Content-Type': 'application/json' }),
     body: JSON.stringify({})
   })
-    .then(res => res.json())
+    .then(res => {
+      sessionId = res.headers.get('X-Session-ID') || sessionId;
+      return res.json();
+    })
     .then(data => {
       if (data.success) {
-        currentCase = data.data.case_data;
-        gameState = data.data.game_state;
+        currentCase = data.data.case;
+        gameState = data.game_state;
         
         // Show game interface
         mainMenu.style.display = 'none';
@@ -293,9 +346,9 @@ function startGame() {
         gameRules.style.display = 'none';
         gameInterface.style.display = 'block';
         
-        // Load witnesses and evidence
-        loadWitnesses();
-        loadEvidence();
+        // Render witnesses and evidence from the bootstrap payload
+        renderWitnesses(data.data.witnesses);
+        renderEvidence(data.data.evidence);
         
         // Add initial message and update speaker display
         updateSpeakerDisplay('Judge', 'Court is now in session. The defense may proceed.');
@@ -312,33 +365,37 @@ function startGame() {
     .finally(() => setLoading(false));
 }
 
+function renderWitnesses(witnesses) {
+  witnessList.innerHTML = witnesses.map(witness => `
+    <div class="witness-item" onclick="callWitness('${witness}')">
+      <strong>${witness}</strong>
+    </div>
+  `).join('');
+}
+
+function renderEvidence(evidenceItems) {
+  evidenceList.innerHTML = evidenceItems.map(evidence => `
+    <div class="evidence-item ${evidence.presented ? 'presented' : ''}" onclick="useEvidence('${evidence.id}')">
+      <div class="evidence-name">${evidence.name}</div>
+      <div class="evidence-points">${evidence.points_value} points</div>
+      ${evidence.presented ? '<small>Presented</small>' : ''}
+    </div>
+  `).join('');
+}
+
 function loadWitnesses() {
-  fetch('http://localhost:8000/witnesses')
+  fetch('http://localhost:8000/witnesses', { headers: apiHeaders() })
     .then(res => res.json())
-    .then(data => {
-      witnessList.innerHTML = data.witnesses.map(witness => `
-        <div class="witness-item" onclick="callWitness('${witness}')">
-          <strong>${witness}</strong>
-        </div>
-      `).join('');
-    })
+    .then(data => renderWitnesses(data.witnesses))
     .catch(err => {
       console.error('Failed to load witnesses:', err);
     });
 }
 
 function loadEvidence() {
-  fetch('http://localhost:8000/evidence')
+  fetch('http://localhost:8000/evidence', { headers: apiHeaders() })
     .then(res => res.json())
-    .then(data => {
-      evidenceList.innerHTML = data.evidence.map(evidence => `
-        <div class="evidence-item ${evidence.presented ? 'presented' : ''}" onclick="useEvidence('${evidence.id}')">
-          <div class="evidence-name">${evidence.name}</div>
-          <div class="evidence-points">${evidence.points_value} points</div>
-          ${evidence.presented ? '<small>Presented</small>' : ''}
-        </div>
-      `).join('');
-    })
+    .then(data => renderEvidence(data.evidence))
     .catch(err => {
       console.error('Failed to load evidence:', err);
     });
@@ -350,7 +407,7 @@ function callWitness(witnessName) {
   setLoading(true);
   fetch('http://localhost:8000/call_witness', {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
+    headers: apiHeaders({ 'Content-Type': 'application/json' }),
     body: JSON.stringify({ witness_name: witnessName })
   })
     .then(res => res.json())
@@ -396,12 +453,17 @@ function askQuestion() {
   if (!question || loading) return;
   
   setLoading(true);
-  fetch('http://localhost:8000/question_witness', {
-    method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ question: question })
+  
+  // Show the witness's answer as it streams in
+  let streamedText = '';
+  if (gameState) {
+    speakerName.textContent = gameState.current_witness;
+    speakerImage.src = getSpeakerImage(gameState.current_witness);
+  }
+  streamAction('http://localhost:8000/question_witness/stream', { question: question }, token => {
+    streamedText += token;
+    speakerText.textContent = streamedText;
   })
-    .then(res => res.json())
     .then(data => {
       if (data.success) {
         gameState = data.game_state;
@@ -442,7 +504,7 @@ function useEvidence(evidenceId) {
   setLoading(true);
   fetch('http://localhost:8000/use_evidence', {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
+    headers: apiHeaders({ 'Content-Type': 'application/json' }),
     body: JSON.stringify({ evidence_id: evidenceId })
   })
     .then(res => res.json())
@@ -480,12 +542,15 @@ function chatWithJudge() {
   if (!statement || loading) return;
   
   setLoading(true);
-  fetch('http://localhost:8000/judge_chat', {
-    method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ statement: statement })
+  
+  // Show the judge's reply as it streams in
+  let streamedText = '';
+  speakerName.textContent = 'Judge';
+  speakerImage.src = getSpeakerImage('Judge');
+  streamAction('http://localhost:8000/judge_chat/stream', { statement: statement }, token => {
+    streamedText += token;
+    speakerText.textContent = streamedText;
   })
-    .then(res => res.json())
     .then(data => {
       if (data.success) {
         gameState = data.game_state;
@@ -521,7 +586,7 @@ function getClue() {
   setLoading(true);
   fetch('http://localhost:8000/get_clue', {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
+    headers: apiHeaders({ 'Content-Type': 'application/json' }),
     body: JSON.stringify({})
   })
     .then(res => res.json())
@@ -570,7 +635,7 @@ function getVerdict() {
   if (loading) return;
   
   setLoading(true);
-  fetch('http://localhost:8000/verdict')
+  fetch('http://localhost:8000/verdict', { headers: apiHeaders() })
     .then(res => res.json())
     .then(data => {
       if (data.success) {
@@ -2,8 +2,13 @@
 """
 Run script for CourtroomAI: Legal Minds
 This script properly sets up the Python path and starts the FastAPI server.
+
+Pass --workers N (or set WEB_CONCURRENCY) to serve one port from N processes.
+Players' games are only shared between workers through a SQLite or Redis
+session store, e.g. SESSION_STORE=sqlite:///sessions.db.
 """
 
+import argparse
 import sys
 import os
 from pathlib import Path
@@ -19,12 +24,24 @@ os.chdir(app_dir)
 # Import and run the FastAPI app
 if __name__ == "__main__":
     import uvicorn
-    from main import app
+    
+    parser = argparse.ArgumentParser(description="Run the CourtroomAI server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="Worker processes; more than one disables auto-reload")
+    args = parser.parse_args()
+    
+    if args.workers > 1 and os.getenv("SESSION_STORE", "memory") == "memory":
+        print("⚠️  Each worker keeps its own sessions in memory; set SESSION_STORE to share games between workers")
+    # Read by the workers, which turn session snapshots off when there are several
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
     
     print("🚀 Starting CourtroomAI: Legal Minds Server...")
-    print("📍 Server will be available at: http://localhost:8000")
+    print(f"📍 Server will be available at: http://localhost:{args.port}")
     print("🌐 Frontend: Open frontend/index.html in your browser")
-    print("📚 API Documentation: http://localhost:8000/docs")
+    print(f"📚 API Documentation: http://localhost:{args.port}/docs")
     print("\nPress Ctrl+C to stop the server\n")
     
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    # An import string, as uvicorn needs one to reload or start workers
+    uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers, reload=args.workers == 1) 
\ No newline at end of file
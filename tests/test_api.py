@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from case_data import CASE_DATABASE
+from game_engine import CourtroomGameEngine
+from llm_provider import LLMProvider
+from session_manager import SessionManager
+from session_store import MemorySessionStore
+from warmup import WarmupProgress
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """The app with a shared engine that needs no embedding model or LLM, already warmed up"""
+    shared_engine = CourtroomGameEngine(
+        llm_provider=LLMProvider(),
+        vector_store_manager=SimpleNamespace(add_case_data=lambda texts, case_id: None)
+    )
+    monkeypatch.setattr(shared_engine.pregenerated, "is_scheduled", lambda case_id: True)
+    monkeypatch.setattr(main, "session_manager", SessionManager(
+        shared_engine=shared_engine, store=MemorySessionStore(3600, 100)
+    ))
+    warmup = WarmupProgress()
+    warmup.run([])
+    monkeypatch.setattr(main, "warmup", warmup)
+    # Not entered as a context manager, so the startup warm-up does not run
+    return TestClient(main.app)
+
+
+def assert_no_keywords(body, case):
+    body = body.lower()
+    assert '"keywords"' not in body
+    for clue in case.clues:
+        assert not any(f'"{keyword.lower()}"' in body for keyword in clue.keywords)
+
+
+def test_start_case_sends_clues_without_keywords(client):
+    case = CASE_DATABASE["case_001"]
+    response = client.post("/start_case", json={"case_id": case.case_id})
+    assert response.status_code == 200, response.text
+    assert all(clue.description in response.text for clue in case.clues)
+    assert_no_keywords(response.text, case)
+
+
+def test_bootstrap_and_get_clue_send_no_keywords(client):
+    case = CASE_DATABASE["case_001"]
+    response = client.post("/bootstrap", json={"case_id": case.case_id})
+    assert response.status_code == 200, response.text
+    assert_no_keywords(response.text, case)
+    response = client.post("/get_clue", json={}, headers={"X-Session-ID": response.headers["X-Session-ID"]})
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["clue"]["description"]
+    assert_no_keywords(response.text, case)
+
+
+def test_failed_request_leaves_no_unsaved_changes(client, monkeypatch):
+    response = client.post("/start_case", json={"case_id": "case_001"})
+    headers = {"X-Session-ID": response.headers["X-Session-ID"]}
+    assert client.post("/get_clue", json={}, headers=headers).status_code == 200
+    get_clue = CourtroomGameEngine.get_clue
+
+    def get_clue_then_fail(engine):
+        get_clue(engine)
+        raise RuntimeError("failed after changing the game")
+
+    monkeypatch.setattr(CourtroomGameEngine, "get_clue", get_clue_then_fail)
+    assert client.post("/get_clue", json={}, headers=headers).status_code == 500
+    state = client.get("/game_state", headers=headers).json()
+    assert state["current_step"] == 1
+    assert len(state["clues_discovered"]) == 1
@@ -0,0 +1,71 @@
+import random
+
+from case_data import CASE_DATABASE
+from keyword_matcher import KeywordMatcher, LEGAL_KEYWORDS, STRATEGIC_PHRASES, STRATEGIC_QUESTION_KEYWORDS
+
+
+def substring_matches(groups, text):
+    """The per-keyword ``in`` checks the matcher replaced"""
+    text = text.lower()
+    matches = {}
+    for group, keywords in groups.items():
+        for keyword in keywords:
+            if keyword and keyword.lower() in text:
+                matches.setdefault(group, set()).add(keyword.lower())
+    return matches
+
+
+def case_groups(case):
+    """The keyword groups CaseData.keyword_matcher compiles, built from the source lists"""
+    groups = {
+        "question": STRATEGIC_QUESTION_KEYWORDS,
+        "legal": LEGAL_KEYWORDS,
+        "strategic": STRATEGIC_PHRASES,
+        "case": case.keywords,
+    }
+    for clue in case.clues:
+        groups[f"clue:{clue.id}"] = clue.keywords
+    return groups
+
+
+def random_text(rng, keywords):
+    """Words, keywords and keyword fragments run together, so keywords overlap and nest"""
+    fillers = ["the", "witness", "saw", "a", "glove", "at", "nine", "-", ".", "", "ed", "s"]
+    pieces = []
+    for _ in range(rng.randint(0, 12)):
+        roll = rng.random()
+        if roll < 0.4:
+            keyword = rng.choice(keywords)
+            pieces.append(keyword if rng.random() < 0.7 else keyword[:rng.randint(1, len(keyword))])
+        else:
+            pieces.append(rng.choice(fillers))
+        if rng.random() < 0.3:
+            pieces[-1] = pieces[-1].upper()
+    return rng.choice([" ", "", "  "]).join(pieces)
+
+
+def test_overlapping_and_nested_keywords():
+    groups = {"a": ["evidence", "circumstantial evidence"], "b": ["time", "timeline"], "c": ["line"]}
+    matcher = KeywordMatcher(groups)
+    text = "The CIRCUMSTANTIAL EVIDENCE contradicts the timeline"
+    assert matcher.match(text) == substring_matches(groups, text) == {
+        "a": {"evidence", "circumstantial evidence"},
+        "b": {"time", "timeline"},
+        "c": {"line"},
+    }
+
+
+def test_empty_groups_and_text():
+    assert KeywordMatcher({}).match("anything") == {}
+    assert KeywordMatcher({"a": ["alibi"]}).match("") == {}
+
+
+def test_matches_substring_checks_on_random_texts():
+    rng = random.Random(1234)
+    for case in CASE_DATABASE.values():
+        groups = case_groups(case)
+        matcher = case.keyword_matcher
+        keywords = sorted({keyword for group in groups.values() for keyword in group if keyword})
+        for _ in range(5000):
+            text = random_text(rng, keywords)
+            assert matcher.match(text) == substring_matches(groups, text), text
@@ -0,0 +1,48 @@
+import numpy as np
+
+from response_cache import SemanticResponseCache, question_specifics
+
+VECTOR = np.array([1.0, 0.0, 0.0])
+# Cosine similarity 0.95 to VECTOR, above the default threshold
+NEAR_VECTOR = np.array([0.95, np.sqrt(1 - 0.95 ** 2), 0.0])
+
+
+def cache_with(question, answer="I was at home."):
+    cache = SemanticResponseCache(threshold=0.92)
+    cache.store("case_001", "Alice Monroe", question, VECTOR, answer)
+    return cache
+
+
+def test_similar_question_is_served_the_cached_answer():
+    cache = cache_with("Where were you at 9pm?")
+    assert cache.lookup("case_001", "alice monroe", "where were you at 9pm", NEAR_VECTOR) == "I was at home."
+    assert cache.hits == 1
+
+
+def test_question_about_another_time_or_name_misses():
+    cache = cache_with("Were you there at 9pm?")
+    # Embeddings this close still ask about something else
+    assert cache.lookup("case_001", "Alice Monroe", "Were you there at 11pm?", VECTOR) is None
+    assert cache.lookup("case_001", "Alice Monroe", "Were you there at nine?", VECTOR) is None
+
+    cache = cache_with("Did you see Bob Harris that night?")
+    assert cache.lookup("case_001", "Alice Monroe", "Did you see Carol Harris that night?", VECTOR) is None
+
+
+def test_matching_specifics_do_not_bypass_the_threshold():
+    cache = cache_with("Were you there at 9pm?")
+    far_vector = np.array([0.5, np.sqrt(0.75), 0.0])
+    assert cache.lookup("case_001", "Alice Monroe", "Were you there at 9pm?", far_vector) is None
+
+
+def test_lookup_falls_back_to_a_less_similar_entry_with_the_same_specifics():
+    cache = cache_with("Were you there at 11pm?", "No.")
+    cache.store("case_001", "Alice Monroe", "Were you there at 9pm?", NEAR_VECTOR, "Yes.")
+    assert cache.lookup("case_001", "Alice Monroe", "Were you there at 9pm?", VECTOR) == "Yes."
+
+
+def test_question_specifics():
+    assert question_specifics("Were you there at 9:30 p.m.?") == {"9:30", "p.m"}
+    assert question_specifics("Where were you? Did Bob call at ten?") == {"bob", "ten"}
+    # The first word of a sentence and "I" are capitalized anyway
+    assert question_specifics("Where were you when I left?") == frozenset()
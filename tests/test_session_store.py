@@ -0,0 +1,197 @@
+import asyncio
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+
+from case_data import CASE_DATABASE
+from game_engine import CourtroomGameEngine
+from llm_provider import LLMProvider
+from models import GamePhase, GameState
+from session_store import (
+    MemorySessionStore, RedisSessionStore, SessionConflictError, SQLiteSessionStore, decode_session, encode_session
+)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+import mock_redis_server  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def redis_url():
+    """A mock Redis server on a free port, run on an event loop in its own thread"""
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(mock_redis_server.create_server("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield f"redis://127.0.0.1:{server.sockets[0].getsockname()[1]}/1"
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def open_store(request, tmp_path):
+    """Opens a handle on one shared store, as each worker does; memory stores are per process, so one handle"""
+    handles = []
+    memory = {}
+
+    def open_store(ttl_seconds=3600):
+        if request.param == "memory":
+            store = memory.setdefault(ttl_seconds, MemorySessionStore(ttl_seconds, 100))
+        elif request.param == "sqlite":
+            store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl_seconds)
+        else:
+            store = RedisSessionStore(request.getfixturevalue("redis_url"), ttl_seconds)
+        handles.append(store)
+        return store
+
+    yield open_store
+    for store in handles:
+        store.close()
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+def test_save_and_load(open_store):
+    store = open_store()
+    session_id = new_session_id()
+    assert store.load(session_id) is None
+    assert store.save(session_id, b"first", 0) == 1
+    assert store.save(session_id, b"second", 1) == 2
+    assert open_store().load(session_id) == (2, b"second")
+    # The caller already holds version 2, so the payload is not sent again
+    assert store.load(session_id, known_version=2) == (2, None)
+
+
+def test_stale_save_conflicts(open_store):
+    worker_a, worker_b = open_store(), open_store()
+    session_id = new_session_id()
+    worker_a.save(session_id, b"start", 0)
+    assert worker_b.save(session_id, b"worker b", 1) == 2
+    with pytest.raises(SessionConflictError):
+        worker_a.save(session_id, b"worker a", 1)
+    with pytest.raises(SessionConflictError):
+        worker_a.save(session_id, b"new session", 0)
+    assert worker_a.load(session_id) == (2, b"worker b")
+
+
+def test_delete(open_store):
+    store = open_store()
+    session_id = new_session_id()
+    store.save(session_id, b"payload", 0)
+    open_store().delete(session_id)
+    assert store.load(session_id) is None
+
+
+def test_sessions_expire(open_store, request):
+    # Redis takes whole seconds
+    ttl_seconds = 1 if request.node.callspec.params["open_store"] == "redis" else 0.2
+    store = open_store(ttl_seconds)
+    session_id = new_session_id()
+    store.save(session_id, b"old game", 0)
+    time.sleep(ttl_seconds + 0.1)
+    assert store.load(session_id) is None
+    with pytest.raises(SessionConflictError):
+        store.save(session_id, b"stale", 1)
+    # The id is free again, though an expired row may still hold it
+    assert store.save(session_id, b"new game", 0) == 1
+    assert store.load(session_id) == (1, b"new game")
+
+
+def test_redis_save_conflicts_when_key_changes_after_watch(redis_url):
+    worker_a, worker_b = RedisSessionStore(redis_url, 3600), RedisSessionStore(redis_url, 3600)
+    session_id = new_session_id()
+    worker_a.save(session_id, b"start", 0)
+    command = worker_a._command
+
+    def command_racing_worker_b(*commands):
+        # Worker b saves between worker a's WATCH and its MULTI/EXEC
+        if commands[0] == ("MULTI",):
+            worker_b.save(session_id, b"worker b", 1)
+        return command(*commands)
+
+    worker_a._command = command_racing_worker_b
+    with pytest.raises(SessionConflictError):
+        worker_a.save(session_id, b"worker a", 1)
+    assert worker_b.load(session_id) == (2, b"worker b")
+    worker_a.close()
+    worker_b.close()
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "sessions.snapshot")
+    store = MemorySessionStore(3600, 100)
+    saved = {}
+    for index in range(5):
+        session_id = new_session_id()
+        payload = encode_session({"game_state": None, "step": index})
+        version = store.save(session_id, payload, 0)
+        for _ in range(index):
+            version = store.save(session_id, payload, version)
+        saved[session_id] = (version, payload)
+    assert store.save_snapshot(path) == 5
+    assert [entry.name for entry in tmp_path.iterdir()] == ["sessions.snapshot"]
+
+    restored = MemorySessionStore(3600, 100)
+    kept_id = next(iter(saved))
+    restored.save(kept_id, b"saved since", 0)
+    assert restored.load_snapshot(path) == 5
+    for session_id, (version, payload) in saved.items():
+        if session_id != kept_id:
+            assert restored.load(session_id) == (version, payload)
+            assert decode_session(restored.load(session_id)[1])["game_state"] is None
+    assert restored.load(kept_id) == (1, b"saved since")
+
+
+def test_snapshot_skips_expired_sessions(tmp_path):
+    path = str(tmp_path / "sessions.snapshot")
+    store = MemorySessionStore(0.2, 100)
+    store.save(new_session_id(), b"payload", 0)
+    store.save_snapshot(path)
+    time.sleep(0.3)
+    assert MemorySessionStore(3600, 100).load_snapshot(path) == 0
+
+
+def test_load_snapshot_rejects_other_files(tmp_path):
+    path = tmp_path / "not-a-snapshot"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        MemorySessionStore(3600, 100).load_snapshot(str(path))
+    assert MemorySessionStore(3600, 100).load_snapshot(str(tmp_path / "missing")) == 0
+
+
+def test_state_version_continues_after_restore(monkeypatch):
+    def new_engine():
+        # An existing vector store manager skips building the shared indexes
+        engine = CourtroomGameEngine(llm_provider=LLMProvider(), vector_store_manager=object())
+        monkeypatch.setattr(engine.pregenerated, "is_scheduled", lambda case_id: True)
+        return engine
+
+    case = CASE_DATABASE["case_001"]
+    state = GameState(
+        case_id=case.case_id, phase=GamePhase.CASE_INTRO, current_step=0, max_steps=case.objective.max_steps,
+        player_score=0.0, witnesses_examined=[], evidence_presented=[], clues_discovered=[],
+        objections_raised=[], judge_notes=[], case_summary=case.description,
+        available_actions=["call_witness", "use_evidence", "get_clue"]
+    )
+    worker_a = new_engine()
+    worker_a.restore_session({
+        "game_state": state.model_dump(mode="json", exclude={"case_summary"}),
+        "presented_evidence": [], "discovered_clues": [], "conversation_history": []
+    })
+    first_version, _ = worker_a.versioned_state()
+    worker_a.get_clue()
+    saved_version, _ = worker_a.versioned_state()
+
+    worker_b = new_engine()
+    worker_b.restore_session(decode_session(encode_session(worker_a.export_session())))
+    version, restored_state = worker_b.versioned_state()
+    assert version > saved_version > first_version
+    # Snapshots of the earlier versions stayed with worker a, so clients get the full state
+    assert worker_b.state_delta(first_version, restored_state) is None
+    assert worker_b.state_delta(saved_version, restored_state) is None
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Pre-populate the witness response cache for CourtroomAI: Legal Minds.
+Asks every witness a list of canonical questions offline and saves the answers,
+so the server can serve them without calling the LLM. Witness introductions and
+the judge's evidence rulings are pre-generated and saved as well.
+
+Usage:
+    python warm_response_cache.py [--case case_001] [--questions questions.json] [--output path]
+
+The questions file maps witness names to lists of questions. Witnesses it does
+not mention are asked DEFAULT_QUESTIONS.
+"""
+
+import argparse
+import json
+import sys
+import os
+from pathlib import Path
+
+# Add the app directory to Python path
+project_root = Path(__file__).parent
+app_dir = project_root / "app"
+sys.path.insert(0, str(app_dir))
+
+DEFAULT_QUESTIONS = [
+    "Where were you when the crime happened?",
+    "What exactly did you see?",
+    "What time did you arrive?",
+    "Did you see anyone acting suspiciously?",
+    "Can anyone confirm your whereabouts?",
+    "Did you notice anything unusual that evening?",
+    "Who else had the opportunity to commit the crime?",
+    "How certain are you about the timeline?",
+    "Were there any gaps in security?",
+    "Is there anything you left out of your statement?",
+]
+
+
+def main():
+    from game_engine import CourtroomGameEngine
+    from case_data import CASE_DATABASE
+    from response_cache import RESPONSE_CACHE_PATH
+    from pregenerated import PREGENERATED_PATH
+
+    parser = argparse.ArgumentParser(description="Pre-populate the witness response cache")
+    parser.add_argument("--case", action="append", dest="cases",
+                        help="Case id to warm (repeatable, default: every case)")
+    parser.add_argument("--questions", help="JSON file mapping witness names to canonical questions")
+    parser.add_argument("--output", default=RESPONSE_CACHE_PATH, help="Cache file to write")
+    parser.add_argument("--pregenerated-output", default=PREGENERATED_PATH,
+                        help="File to write pre-generated introductions and evidence rulings to")
+    args = parser.parse_args()
+
+    questions_by_witness = {}
+    if args.questions:
+        with open(args.questions, encoding="utf-8") as f:
+            questions_by_witness = {name.lower(): questions for name, questions in json.load(f).items()}
+
+    engine = CourtroomGameEngine()
+    cache = engine.response_cache
+
+    for case_id in args.cases or list(CASE_DATABASE.keys()):
+        prompts = engine._pregeneration_prompts(CASE_DATABASE[case_id])
+        engine.pregenerated.generate_case(case_id, prompts, engine._pregenerate_llm)
+        engine.start_case(case_id)
+        for witness in engine.current_case.witnesses:
+            if not witness.cache_responses:
+                print(f"⏭️  {case_id} / {witness.name}: opted out of caching")
+                continue
+
+            questions = questions_by_witness.get(witness.name.lower(), DEFAULT_QUESTIONS)
+            for question in questions:
+                vector = engine.vector_store_manager.embed_query(question)
+                if cache.lookup(case_id, witness.name, vector) is not None:
+                    continue
+                context = engine._retrieve_relevant_context(question, witness.name)
+                answer = engine._invoke_llm(engine._format_witness_prompt(question, witness, context), "witness")
+                cache.store(case_id, witness.name, question, vector, answer, pinned=True)
+            print(f"✅ {case_id} / {witness.name}: {len(questions)} questions")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    cache.save(args.output)
+    print(f"💾 Saved {cache.stats()['entries']} cached answers to {args.output}")
+    
+    os.makedirs(os.path.dirname(os.path.abspath(args.pregenerated_output)), exist_ok=True)
+    engine.pregenerated.save(args.pregenerated_output)
+    print(f"💾 Saved pre-generated introductions and evidence rulings to {args.pregenerated_output}")
+
+
+if __name__ == "__main__":
+    main()